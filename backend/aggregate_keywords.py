@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Script untuk menggabungkan kata kunci semua dokumen menjadi daftar topik
+korpus: variasi yang hampir sama (bentuk jamak, imbuhan, huruf besar/kecil)
+digabung dan diurutkan menurut jumlah dokumen.
+
+Usage:
+    python aggregate_keywords.py                      # top 50 keywords of the corpus
+    python aggregate_keywords.py --top 100
+    python aggregate_keywords.py --merge-contained    # also fold "learning" into "machine learning"
+"""
+
+import sys
+from collections import Counter
+from app.core.database import SessionLocal, engine
+from app.models.migrations import upgrade_schema
+from app.models.models import Document, Keyword
+from app.services.keyword_dedup import KeywordTrie
+
+DEFAULT_TOP = 50
+
+def option_value(name: str, default: int) -> int:
+    if name in sys.argv:
+        return int(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+def main():
+    print("🏷️  ResearchMate - Corpus Keywords")
+    print("==================================")
+
+    top = option_value("--top", DEFAULT_TOP)
+    upgrade_schema(engine)  # documents.language on older databases
+    tries = {}  # one trie per language, the stems differ
+    groups = []
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Keyword.keyword, Keyword.document_id, Document.language)
+            .join(Document, Keyword.document_id == Document.id)
+            .yield_per(5000)
+        )
+        for keyword, document_id, language in rows:
+            language = language or "id"
+            trie = tries.setdefault(language, KeywordTrie(language))
+            group = trie.get(keyword)
+            if group is None:
+                group = {'forms': Counter(), 'documents': set(), 'language': language}
+                if not trie.insert(keyword, group):
+                    continue  # nothing left after tokenizing
+                groups.append(group)
+            group['forms'][keyword.strip()] += 1
+            group['documents'].add(document_id)
+    except Exception as e:
+        print(f"❌ Error reading keywords: {e}")
+        return 1
+    finally:
+        db.close()
+
+    groups.sort(key=lambda group: len(group['documents']), reverse=True)
+
+    if "--merge-contained" in sys.argv:
+        # Most widespread phrase first, so it absorbs the phrases it overlaps
+        merged_tries = {}
+        merged = []
+        for group in groups:
+            trie = merged_tries.setdefault(group['language'], KeywordTrie(group['language']))
+            phrase = group['forms'].most_common(1)[0][0]
+            target = trie.find_overlap(phrase)
+            if target is None:
+                trie.add(phrase, group)
+                merged.append(group)
+            else:
+                target['forms'].update(group['forms'])
+                target['documents'] |= group['documents']
+        groups = sorted(merged, key=lambda group: len(group['documents']), reverse=True)
+
+    print(f"{len(groups)} distinct keywords\n")
+    for group in groups[:top]:
+        forms = group['forms'].most_common()
+        variants = f"  (+{len(forms) - 1} variants)" if len(forms) > 1 else ""
+        print(f"{len(group['documents']):>6}  {forms[0][0]}{variants}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
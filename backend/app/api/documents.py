@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
 from pathlib import Path
+import asyncio
+import hashlib
+import time
 import uuid
 import aiofiles
 import logging
-from typing import List, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 import json
 from datetime import datetime
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.models.models import User, Document, Summary, Keyword, ProcessingJob
+from app.models.models import User, Document, DocumentPage, Summary, Keyword, ProcessingJob
 from app.schemas.schemas import (
     Document as DocumentSchema,
     DocumentWithContent,
+    DocumentPage as DocumentPageSchema,
+    SearchHit,
     UploadResponse,
     AnalysisResult,
     DocumentAnalysis,
@@ -21,11 +26,97 @@ from app.schemas.schemas import (
 )
 from app.api.deps import get_current_active_user
 from app.services.pdf_processor import pdf_processor
-from app.services.nlp_service import nlp_service
+from app.services.bounded_extraction import bounded_extractor
+from app.services.language import language_detector
+from app.services.nlp_service import LLM_KEYWORD_METHODS, LLM_SUMMARY_METHODS, nlp_service
+from app.services.analysis_cache import analysis_cache
+from app.services.retrieval import retrieval_service
+from app.services.search_index import search_index
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+PDF_MAGIC = b"%PDF-"
+
+async def _save_upload(file: UploadFile, file_path: Path) -> Tuple[int, str]:
+    """Write an upload to disk in fixed-size chunks; returns (size, sha256 hex)."""
+    hasher = hashlib.sha256()
+    file_size = 0
+    
+    try:
+        async with aiofiles.open(file_path, 'wb') as f:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                # Abort as soon as the first bytes show this is not a PDF
+                if file_size == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="File is not a valid PDF"
+                    )
+                
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File size must be less than {settings.MAX_FILE_SIZE // (1024*1024)}MB"
+                    )
+                
+                hasher.update(chunk)
+                await f.write(chunk)
+        
+        if file_size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty"
+            )
+    except BaseException:
+        # Never leave partial uploads behind
+        file_path.unlink(missing_ok=True)
+        raise
+    
+    return file_size, hasher.hexdigest()
+
+async def _run_stage(name: str, stage: Awaitable[Any]) -> Tuple[Any, float, Optional[str]]:
+    """Await one analysis stage; returns (result, elapsed ms, error) and never raises."""
+    started = time.perf_counter()
+    try:
+        result = await stage
+        error = None
+    except Exception as e:
+        logger.error(f"Analysis stage '{name}' failed: {e}")
+        result, error = None, str(e)
+    return result, round((time.perf_counter() - started) * 1000, 1), error
+
+def _extraction_cache_key(content_hash: str) -> str:
+    """Extraction cache key: the PDF hash plus the settings that shape the extracted text."""
+    return analysis_cache.make_key(content_hash, {
+        'stage': 'extraction',
+        'pdf_min_page_chars': settings.PDF_MIN_PAGE_CHARS,
+    })
+
+def _analysis_cache_key(content_hash: str) -> str:
+    """Analysis cache key: the PDF hash plus the settings that shape the analysis."""
+    return analysis_cache.make_key(content_hash, {
+        'stage': 'analysis',
+        'analysis_mode': settings.ANALYSIS_MODE,
+        'summary_map_reduce': settings.SUMMARY_MAP_REDUCE,
+        'summary_batch_chars': settings.SUMMARY_BATCH_CHARS,
+        'summary_max_batches': settings.SUMMARY_MAX_BATCHES,
+        'keyword_windowed': settings.KEYWORD_WINDOWED,
+        'keyword_token_budget': settings.KEYWORD_TOKEN_BUDGET,
+        'keyword_window_tokens': settings.KEYWORD_WINDOW_TOKENS,
+    })
+
+def _is_llm_analysis(summary_result: Dict[str, Any], keywords_result: List[Dict[str, Any]]) -> bool:
+    """Whether both summary and keywords came from the LLM rather than a local fallback."""
+    return (
+        summary_result.get('method') in LLM_SUMMARY_METHODS
+        and any(kw.get('method') in LLM_KEYWORD_METHODS for kw in keywords_result)
+    )
+
 @router.post("/upload", response_model=UploadResponse)
 async def upload_document(
     file: UploadFile = File(...),
@@ -41,7 +132,8 @@ async def upload_document(
                 detail="Only PDF files are allowed"
             )
         
-        if not file.size or file.size > settings.MAX_FILE_SIZE:
+        # Reject early when the client already told us the file is too big
+        if file.size and file.size > settings.MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File size must be less than {settings.MAX_FILE_SIZE // (1024*1024)}MB"
@@ -52,19 +144,35 @@ async def upload_document(
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = Path(settings.UPLOAD_DIR) / unique_filename
         
-        # Save file to disk
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        # Stream the upload to disk, hashing and size-checking as it goes
+        file_size, content_hash = await _save_upload(file, file_path)
+        
+        # Validate the PDF structure from the saved file
+        try:
+            with pdf_processor.open_session(file_path, filename=file.filename) as session:
+                is_valid, message = pdf_processor.validate_session(session)
+                page_count = session.page_count
+        except Exception as e:
+            logger.warning(f"Rejected unreadable PDF {file.filename}: {e}")
+            is_valid, message = False, "Invalid PDF file"
+        
+        if not is_valid:
+            file_path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=message
+            )
         
         # Create document record
         document = Document(
             filename=unique_filename,
             original_filename=file.filename,
             file_path=str(file_path),
-            file_size=file.size,
+            file_size=file_size,
             mime_type=file.content_type or "application/pdf",
+            content_hash=content_hash,
             processing_status="uploaded",
+            page_count=page_count,
             owner_id=current_user.id
         )
         
@@ -93,6 +201,7 @@ async def upload_document(
 @router.post("/{document_id}/process", response_model=AnalysisResult)
 async def process_document(
     document_id: int,
+    refresh: bool = Query(False, description="Ignore cached results of the same PDF and extract and analyse again"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -114,8 +223,32 @@ async def process_document(
         document.processing_status = "processing"
         db.commit()
         
-        # Process PDF
-        pdf_result = pdf_processor.process_pdf(Path(document.file_path))
+        stage_timings = {}
+        
+        # Reuse the parse and the analysis of an identical PDF processed before;
+        # the parse is cached on its own so it is reused even without an LLM
+        extraction_key = analysis_key = None
+        if document.content_hash:
+            extraction_key = _extraction_cache_key(document.content_hash)
+            analysis_key = _analysis_cache_key(document.content_hash)
+        pdf_result = cached = None
+        if not refresh and extraction_key:
+            pdf_result = await asyncio.to_thread(analysis_cache.get, extraction_key)
+            if pdf_result:
+                logger.info(f"Extraction cache hit for {document.original_filename}")
+                cached = await asyncio.to_thread(analysis_cache.get, analysis_key)
+                if cached:
+                    logger.info(f"Analysis cache hit for {document.original_filename}")
+        if not pdf_result:
+            # Process PDF off the event loop, in an isolated worker with time
+            # and memory limits unless disabled
+            extract = bounded_extractor.process_pdf if settings.PDF_EXTRACTION_ISOLATED else pdf_processor.process_pdf
+            started = time.perf_counter()
+            pdf_result = await asyncio.to_thread(extract, Path(document.file_path))
+            stage_timings['extraction'] = round((time.perf_counter() - started) * 1000, 1)
+            # Partial extractions are not cached, a later run may get every page
+            if extraction_key and pdf_result['success'] and not pdf_result.get('partial'):
+                await asyncio.to_thread(analysis_cache.put, extraction_key, pdf_result)
         
         if not pdf_result['success']:
             document.processing_status = "failed"
@@ -132,6 +265,32 @@ async def process_document(
         document.extracted_text = pdf_result['text']
         document.word_count = pdf_result.get('word_count', 0)
         document.char_count = pdf_result.get('char_count', 0)
+        # Detected once here; keyword extraction and later stages reuse it
+        document.language = language_detector.detect(pdf_result['text'])
+        if pdf_result.get('partial'):
+            skipped = pdf_result.get('skipped_pages', [])
+            document.processing_error = (
+                f"Partial extraction ({pdf_result.get('limit_reached')}): "
+                f"{len(skipped)} pages skipped"
+            )
+        
+        # Store per-page text so callers can read page ranges
+        db.query(DocumentPage).filter(DocumentPage.document_id == document.id).delete()
+        for page in pdf_result.get('pages', []):
+            db.add(DocumentPage(
+                document_id=document.id,
+                page_number=page['page_number'],
+                text=page['text'],
+                word_count=len(page['text'].split()),
+                char_count=len(page['text']),
+                extraction_engine=page.get('engine')
+            ))
+        
+        # Keep the full-text search index in step with the stored pages
+        search_index.index_document(
+            db, document.id, document.owner_id,
+            pdf_result.get('pages') or [{'page_number': None, 'text': pdf_result['text']}]
+        )
         
         # Update metadata
         metadata = pdf_result.get('metadata', {})
@@ -140,8 +299,60 @@ async def process_document(
         document.pdf_subject = metadata.get('subject', '')
         document.page_count = metadata.get('page_count', 0)
         
-        # Generate summary
-        summary_result = await nlp_service.summarize_text(pdf_result['text'])
+        # Summary, keywords and the QA index are independent: run them together,
+        # a failing stage leaves the others' results intact
+        stages = {
+            'indexing': asyncio.to_thread(retrieval_service.build_index, document.id, pdf_result['text'])
+        }
+        if cached:
+            summary_result = cached['summary']
+            keywords_result = cached['keywords']
+        elif settings.ANALYSIS_MODE == "merged":
+            # One LLM call for summary and keyword selection instead of two
+            stages['analysis'] = nlp_service.analyze_document(pdf_result['text'], language=document.language)
+        else:
+            stages['summary'] = nlp_service.summarize_text(pdf_result['text'])
+            stages['keywords'] = nlp_service.extract_keywords(pdf_result['text'], language=document.language)
+        
+        with nlp_service.track_token_usage() as token_usage:
+            outcomes = await asyncio.gather(*(_run_stage(name, stage) for name, stage in stages.items()))
+        if token_usage['calls'] or token_usage['cache_hits']:
+            logger.info(
+                f"LLM usage for {document.original_filename}: {token_usage['calls']} calls, "
+                f"{token_usage['total_tokens']} tokens ({token_usage['prompt_tokens']} prompt), "
+                f"{token_usage['cache_hits']} cache hits"
+            )
+        stage_results = {}
+        stage_errors = {}
+        for name, (result, elapsed_ms, error) in zip(stages, outcomes):
+            stage_results[name] = result
+            stage_timings[name] = elapsed_ms
+            if error:
+                stage_errors[name] = error
+        
+        if not cached:
+            if 'analysis' in stages:
+                analysis = stage_results['analysis'] or {}
+                # A failed half of the analysis counts as a failed stage of its own
+                stage_errors.update(analysis.get('errors', {}))
+                summary_result = analysis.get('summary') or {}
+                keywords_result = analysis.get('keywords') or []
+            else:
+                summary_result = stage_results['summary'] or {}
+                keywords_result = stage_results['keywords'] or []
+            # Degraded results (local fallbacks after an outage or without an API
+            # key) are not cached, so a later upload gets a fresh LLM analysis
+            if (analysis_key and not pdf_result.get('partial') and not stage_errors
+                    and _is_llm_analysis(summary_result, keywords_result)):
+                await asyncio.to_thread(analysis_cache.put, analysis_key, {
+                    'summary': summary_result,
+                    'keywords': keywords_result
+                })
+        
+        if stage_errors:
+            failed = ", ".join(f"{name}: {error}" for name, error in stage_errors.items())
+            document.processing_error = "; ".join(filter(None, [document.processing_error, f"Stage failed ({failed})"]))
+        
         if summary_result.get('summary'):
             summary = Summary(
                 document_id=document.id,
@@ -151,8 +362,6 @@ async def process_document(
             )
             db.add(summary)
         
-        # Extract keywords
-        keywords_result = await nlp_service.extract_keywords(pdf_result['text'])
         for keyword_obj in keywords_result:
             keyword = Keyword(
                 document_id=document.id,
@@ -199,7 +408,9 @@ async def process_document(
             document_id=document_id,
             summary=summary_data,
             keywords=keywords_list,
-            processing_status="completed"
+            processing_status="completed",
+            stage_timings=stage_timings,
+            token_usage=token_usage
         )
     
     except HTTPException:
@@ -240,6 +451,45 @@ async def get_documents(
             detail="Failed to retrieve documents"
         )
 
+@router.get("/search", response_model=List[SearchHit])
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search the text of all the user's documents; returns ranked page snippets."""
+    try:
+        if not search_index.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Full-text search is not available"
+            )
+        
+        hits = search_index.search(db, current_user.id, q, skip=skip, limit=limit)
+        if not hits:
+            return []
+        
+        filenames = dict(db.query(Document.id, Document.original_filename).filter(
+            Document.id.in_({hit['document_id'] for hit in hits}),
+            Document.owner_id == current_user.id
+        ).all())
+        
+        return [
+            SearchHit(original_filename=filenames[hit['document_id']], **hit)
+            for hit in hits if hit['document_id'] in filenames
+        ]
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Search error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Search failed"
+        )
+
 @router.get("/{document_id}", response_model=DocumentWithContent)
 async def get_document(
     document_id: int,
@@ -270,6 +520,59 @@ async def get_document(
             detail="Failed to retrieve document"
         )
 
+@router.get("/{document_id}/pages", response_model=List[DocumentPageSchema])
+async def get_document_pages(
+    document_id: int,
+    from_page: int = Query(1, alias="from", ge=1),
+    to_page: Optional[int] = Query(None, alias="to", ge=1),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the extracted text of a page range (inclusive)."""
+    try:
+        document = db.query(Document).filter(
+            Document.id == document_id,
+            Document.owner_id == current_user.id
+        ).first()
+        
+        if not document:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        
+        if to_page is None:
+            to_page = from_page + settings.MAX_PAGE_RANGE - 1
+        
+        if to_page < from_page:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must not be smaller than 'from'"
+            )
+        
+        if to_page - from_page + 1 > settings.MAX_PAGE_RANGE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.MAX_PAGE_RANGE} pages can be read at once"
+            )
+        
+        pages = db.query(DocumentPage).filter(
+            DocumentPage.document_id == document_id,
+            DocumentPage.page_number >= from_page,
+            DocumentPage.page_number <= to_page
+        ).order_by(DocumentPage.page_number).all()
+        
+        return pages
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get document pages error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve document pages"
+        )
+
 @router.get("/{document_id}/analysis", response_model=DocumentAnalysis)
 async def get_document_analysis(
     document_id: int,
@@ -345,6 +648,8 @@ async def delete_document(
         file_path = Path(document.file_path)
         if file_path.exists():
             file_path.unlink()
+        retrieval_service.delete_index(document.id)
+        search_index.remove_document(db, document.id)
         
         # Delete from database (cascading will handle related records)
         db.delete(document)
@@ -1,17 +1,65 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, AsyncIterator, Dict, List
+import asyncio
+import json
 import logging
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.models.models import User, Document, QASession
 from app.schemas.schemas import QARequest, QAResponse, QASession as QASessionSchema
 from app.api.deps import get_current_active_user
 from app.services.nlp_service import nlp_service
+from app.services.retrieval import retrieval_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+async def _load_qa_document(document_id: int, current_user: User, db: Session) -> Document:
+    """Document the user may ask about, with its retrieval index ready."""
+    document = db.query(Document).filter(
+        Document.id == document_id,
+        Document.owner_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if document.processing_status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document processing not completed"
+        )
+    
+    # Documents processed before chunk indexing get their index on first use
+    if not retrieval_service.has_index(document.id):
+        if not document.extracted_text:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No text content available for question answering"
+            )
+        await asyncio.to_thread(retrieval_service.build_index, document.id, document.extracted_text)
+    
+    return document
+
+def _history_list(qa_request: QARequest) -> List[Dict[str, Any]]:
+    """Convert conversation history to dict format."""
+    return [
+        {
+            "role": msg.role,
+            "content": msg.content,
+            "timestamp": msg.timestamp
+        }
+        for msg in qa_request.conversation_history or []
+    ]
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
 @router.post("/", response_model=QAResponse)
 async def ask_question(
     qa_request: QARequest,
@@ -20,45 +68,14 @@ async def ask_question(
 ):
     """Ask a question about a document."""
     try:
-        # Get document
-        document = db.query(Document).filter(
-            Document.id == qa_request.document_id,
-            Document.owner_id == current_user.id
-        ).first()
-        
-        if not document:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Document not found"
-            )
-        
-        if document.processing_status != "completed":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Document processing not completed"
-            )
-        
-        if not document.extracted_text:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No text content available for question answering"
-            )
-        
-        # Convert conversation history to dict format
-        history_list = []
-        if qa_request.conversation_history:
-            for msg in qa_request.conversation_history:
-                history_list.append({
-                    "role": msg.role,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp
-                })
+        document = await _load_qa_document(qa_request.document_id, current_user, db)
+        history_list = _history_list(qa_request)
 
         # Generate answer
         qa_result = await nlp_service.answer_question(
             question=qa_request.question,
-            context=document.extracted_text,
-            conversation_history=history_list
+            conversation_history=history_list,
+            document_id=document.id
         )
         
         if not qa_result.get('answer'):
@@ -98,6 +115,70 @@ async def ask_question(
             detail="Question answering failed"
         )
 
+@router.post("/stream")
+async def ask_question_stream(
+    qa_request: QARequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Ask a question about a document; the answer is streamed as Server-Sent Events.
+
+    Events: `token` ({"text"}) for each piece of the answer, then `done` with the
+    full answer and the saved session id, or `error`.
+    """
+    await _load_qa_document(qa_request.document_id, current_user, db)
+    history_list = _history_list(qa_request)
+    user_id = current_user.id
+    username = current_user.username
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in nlp_service.stream_answer(
+                question=qa_request.question,
+                conversation_history=history_list,
+                document_id=qa_request.document_id
+            ):
+                if event["type"] == "token":
+                    yield _sse("token", {"text": event["text"]})
+                    continue
+                
+                # Stream finished: persist the full answer with its own session,
+                # the request's session is not guaranteed to outlive the response
+                with SessionLocal() as session_db:
+                    qa_session = QASession(
+                        document_id=qa_request.document_id,
+                        user_id=user_id,
+                        question=qa_request.question,
+                        answer=event['answer'],
+                        confidence_score=event.get('confidence', 0.5),
+                        context_used=event.get('context_used', '')
+                    )
+                    session_db.add(qa_session)
+                    session_db.commit()
+                    session_id = qa_session.id
+                
+                logger.info(
+                    f"Streamed QA completed for document {qa_request.document_id} by user {username} "
+                    f"(first token after {event.get('time_to_first_token_ms')} ms)"
+                )
+                yield _sse("done", {
+                    "session_id": session_id,
+                    "question": qa_request.question,
+                    "answer": event['answer'],
+                    "confidence_score": event.get('confidence', 0.5),
+                    "context_used": event.get('context_used', ''),
+                    "time_to_first_token_ms": event.get('time_to_first_token_ms')
+                })
+        except Exception as e:
+            logger.error(f"Streaming QA error: {e}")
+            yield _sse("error", {"detail": "Question answering failed"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/document/{document_id}", response_model=List[QASessionSchema])
 async def get_qa_history(
     document_id: int,
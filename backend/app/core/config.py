@@ -16,11 +16,15 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./researchmate.db"
+    TEXT_COMPRESSION_LEVEL: int = 6  # zlib level for large text columns
+    TEXT_COMPRESSION_MIN_BYTES: int = 256  # smaller values are stored uncompressed
     
     # Upload Configuration
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS: str = ".pdf"  # Changed to string, will be parsed
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB per read while streaming uploads
+    MAX_PAGE_RANGE: int = 50  # most pages returned by one /pages request
     
     # AI Models
     USE_GPU: bool = False
@@ -29,9 +33,69 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     
+    # Question answering retrieval
+    INDEX_DIR: str = "./indexes"  # per-document chunk indexes
+    QA_TOP_K_CHUNKS: int = 3  # chunks sent to the LLM per question
+    QA_MAX_CONTEXT_CHARS: int = 4000  # hard cap on the context in the prompt
+    QA_RETRIEVER: str = "tfidf"  # "tfidf" (hashed vectors) or "bm25"
+    QA_HASH_FEATURES: int = 2 ** 18  # hashed vector dimensions
+    
+    # CPU-bound NLP work (YAKE, NLTK) runs off the event loop
+    NLP_EXECUTOR: str = "thread"  # "thread" or "process"
+    NLP_EXECUTOR_WORKERS: int = 2
+    NLP_EXECUTOR_MAX_QUEUE: int = 32  # calls queued or running before callers wait
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5  # event-loop lag sampling period
+    
+    # Keyword extraction on long documents: YAKE runs on sampled windows
+    KEYWORD_WINDOWED: bool = True  # abstract, introduction, headings + strided body windows
+    KEYWORD_TOKEN_BUDGET: int = 3000  # most words fed to YAKE per document
+    KEYWORD_WINDOW_TOKENS: int = 400  # words per window
+    
+    # Summarization of long documents (map-reduce over batches)
+    SUMMARY_MAP_REDUCE: bool = True  # summarize long texts batch by batch instead of truncating
+    SUMMARY_BATCH_CHARS: int = 8000  # text per LLM call
+    SUMMARY_MAX_CONCURRENCY: int = 4  # batch summaries in flight at once
+    # Batches summarized per level before sampling starts (0 = all). Past it, sqrt(cap * batches)
+    # evenly spaced batches are kept: a ~600-page thesis (~225 batches) gets 43, about 19% of its
+    # text. More coverage costs one LLM call (~2.5k tokens) per batch against GROQ_TOKENS_PER_MINUTE
+    SUMMARY_MAX_BATCHES: int = 8
+    
+    # "merged": one LLM call returns summary, bullet points and keyword picks;
+    # "separate": summary and keyword refinement are separate calls
+    ANALYSIS_MODE: str = "merged"
+    
+    # PDF Extraction
+    PDF_EXTRACTION_WORKERS: int = 4  # process pool size for parallel extraction
+    PDF_EXTRACTION_SHARD_SIZE: int = 50  # pages per worker task
+    PDF_PARALLEL_MIN_PAGES: int = 100  # use the process pool from this page count
+    PDF_MIN_PAGE_CHARS: int = 50  # pages below this get a pdfplumber retry
+    PDF_EXTRACTION_ISOLATED: bool = True  # extract (sharded as above) in a worker process under the limits below
+    PDF_ISOLATION_MIN_PAGES: int = 50  # smaller PDFs (also under the size below) skip the ~1s worker start-up
+    PDF_ISOLATION_MIN_MB: int = 5
+    PDF_EXTRACTION_BUDGET_SECONDS: float = 120.0  # wall-clock budget per document
+    PDF_PAGE_TIMEOUT_SECONDS: float = 15.0  # a page taking longer is skipped
+    PDF_WORKER_MAX_RSS_MB: int = 1024  # memory ceiling of the worker and its extraction pool
+    
+    # Analysis cache (results keyed by PDF SHA-256)
+    ANALYSIS_CACHE_DIR: str = "./analysis_cache"
+    ANALYSIS_CACHE_MAX_BYTES: int = 500 * 1024 * 1024  # 500MB
+    
     # LLM API Keys
     GROQ_API_KEY: str = ""
     
+    # Groq rate limits, enforced client-side
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_TOKENS_PER_MINUTE: int = 6000
+    GROQ_MAX_RETRIES: int = 4  # retries after a 429
+    GROQ_BACKOFF_BASE_SECONDS: float = 1.0
+    GROQ_BACKOFF_MAX_SECONDS: float = 30.0
+    
+    # LLM response cache (identical requests are answered from disk)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_MAX_BYTES: int = 100 * 1024 * 1024  # 100MB
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # 7 days
+    
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:3001"  # Changed to string
     
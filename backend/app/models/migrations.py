@@ -0,0 +1,82 @@
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import LargeBinary
+
+from app.models.types import RAW_MARKER
+
+logger = logging.getLogger(__name__)
+
+# Columns added to tables that already exist on older installs. create_all()
+# never alters an existing table, so these are added here: (table, column, DDL type)
+ADDED_COLUMNS: List[Tuple[str, str, str]] = [
+    ("documents", "content_hash", "VARCHAR(64)"),
+    ("documents", "language", "VARCHAR(8)"),
+]
+
+# Indexes on the added columns: (index name, table, column)
+ADDED_INDEXES: List[Tuple[str, str, str]] = [
+    ("ix_documents_content_hash", "documents", "content_hash"),
+]
+
+# TEXT columns that became CompressedText (binary). SQLite stores either in any
+# column and legacy rows load as str, so only other databases need the ALTER: (table, column)
+COMPRESSED_COLUMNS: List[Tuple[str, str]] = [
+    ("documents", "extracted_text"),
+    ("summaries", "bullet_points"),
+    ("qa_sessions", "context_used"),
+]
+
+def _convert_to_binary(conn, dialect: str, table: str, column: str) -> bool:
+    """Turn a TEXT column into a binary one, keeping existing rows readable as uncompressed values."""
+    marker = RAW_MARKER.decode("ascii")
+    if dialect == "postgresql":
+        conn.execute(text(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BYTEA "
+            f"USING convert_to('{marker}' || {column}, 'UTF8')"
+        ))
+        return True
+    if dialect == "mysql":
+        conn.execute(text(f"UPDATE {table} SET {column} = CONCAT('{marker}', {column})"))
+        conn.execute(text(f"ALTER TABLE {table} MODIFY {column} LONGBLOB"))
+        return True
+    logger.warning(f"Cannot convert {table}.{column} to binary on {dialect}; convert it manually")
+    return False
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """Add missing columns and indexes and convert compressed columns; safe to run on every start. Returns what changed."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    applied = []
+
+    with engine.begin() as conn:
+        for table, column, ddl_type in ADDED_COLUMNS:
+            if table not in tables:
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+                applied.append(f"{table}.{column}")
+
+        for index, table, column in ADDED_INDEXES:
+            if table not in tables:
+                continue
+            existing = {ix["name"] for ix in inspector.get_indexes(table)}
+            if index not in existing:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({column})"))
+                applied.append(index)
+
+        if engine.dialect.name != "sqlite":
+            for table, column in COMPRESSED_COLUMNS:
+                if table not in tables:
+                    continue
+                types = {col["name"]: col["type"] for col in inspector.get_columns(table)}
+                if column in types and not isinstance(types[column], LargeBinary):
+                    if _convert_to_binary(conn, engine.dialect.name, table, column):
+                        applied.append(f"{table}.{column} -> binary")
+
+    if applied:
+        logger.info(f"Database schema upgraded: {', '.join(applied)}")
+    return applied
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 
+from app.models.types import CompressedText
+
 Base = declarative_base()
 
 class User(Base):
@@ -31,15 +33,18 @@ class Document(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False)
+    content_hash = Column(String(64), index=True, nullable=True)  # SHA-256 of the PDF bytes
     
     # Processing status
     processing_status = Column(String(50), default="uploaded")  # uploaded, processing, completed, failed
     processing_error = Column(Text, nullable=True)
     
-    # Extracted content
-    extracted_text = Column(Text, nullable=True)
+    # Extracted content (deferred: loaded and decompressed only when accessed,
+    # use pages for ranges)
+    extracted_text = deferred(Column(CompressedText, nullable=True))
     word_count = Column(Integer, nullable=True)
     char_count = Column(Integer, nullable=True)
+    language = Column(String(8), nullable=True)  # detected text language (id, en)
     
     # PDF metadata
     pdf_title = Column(String(500), nullable=True)
@@ -60,13 +65,39 @@ class Document(Base):
     summaries = relationship("Summary", back_populates="document")
     keywords = relationship("Keyword", back_populates="document")
     qa_sessions = relationship("QASession", back_populates="document")
+    pages = relationship(
+        "DocumentPage",
+        back_populates="document",
+        order_by="DocumentPage.page_number",
+        cascade="all, delete-orphan",
+        lazy="dynamic"
+    )
+
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+    __table_args__ = (
+        Index("ix_document_pages_document_page", "document_id", "page_number"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    page_number = Column(Integer, nullable=False)  # 1-based
+    text = Column(CompressedText, nullable=True)
+    word_count = Column(Integer, nullable=True)
+    char_count = Column(Integer, nullable=True)
+    extraction_engine = Column(String(20), nullable=True)  # pymupdf, pdfplumber
+    
+    # Foreign keys
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    
+    # Relationships
+    document = relationship("Document", back_populates="pages")
 
 class Summary(Base):
     __tablename__ = "summaries"
     
     id = Column(Integer, primary_key=True, index=True)
     summary_text = Column(Text, nullable=False)
-    bullet_points = Column(Text, nullable=True)  # JSON string
+    bullet_points = Column(CompressedText, nullable=True)  # JSON string
     summary_type = Column(String(50), default="auto")  # auto, custom, abstract
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -98,7 +129,7 @@ class QASession(Base):
     question = Column(Text, nullable=False)
     answer = Column(Text, nullable=False)
     confidence_score = Column(Float, nullable=True)
-    context_used = Column(Text, nullable=True)
+    context_used = Column(CompressedText, nullable=True)  # ~200 chars, loaded with the row rather than lazily per session
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Foreign keys
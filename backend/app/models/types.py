@@ -0,0 +1,50 @@
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.core.config import settings
+
+# One-byte header in front of every stored value
+COMPRESSED_MARKER = b"z"  # zlib stream follows
+RAW_MARKER = b"r"  # UTF-8 text follows (too small to be worth compressing)
+
+def compress_text(value: str) -> bytes:
+    """Encode text for storage, compressing it when that saves space."""
+    encoded = value.encode("utf-8")
+    if len(encoded) < settings.TEXT_COMPRESSION_MIN_BYTES:
+        return RAW_MARKER + encoded
+    return COMPRESSED_MARKER + zlib.compress(encoded, settings.TEXT_COMPRESSION_LEVEL)
+
+def decompress_text(value: Union[str, bytes, memoryview, None]) -> Optional[str]:
+    """Decode a stored value; rows written before compression come back as plain str."""
+    if value is None or isinstance(value, str):
+        return value
+
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == COMPRESSED_MARKER:
+        return zlib.decompress(payload).decode("utf-8")
+    if marker == RAW_MARKER:
+        return payload.decode("utf-8")
+    return value.decode("utf-8")
+
+class _DriverBinary(LargeBinary):
+    """LargeBinary that returns driver values untouched - legacy TEXT rows arrive as str."""
+
+    def result_processor(self, dialect, coltype):
+        return None
+
+class CompressedText(TypeDecorator):
+    """Text column stored zlib-compressed; decompressed when the value is loaded."""
+
+    impl = _DriverBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from datetime import datetime
 
 # User Schemas
@@ -56,6 +56,7 @@ class Document(DocumentBase):
     word_count: Optional[int] = None
     char_count: Optional[int] = None
     page_count: Optional[int] = None
+    language: Optional[str] = None
     created_at: datetime
     processed_at: Optional[datetime] = None
     
@@ -68,6 +69,23 @@ class DocumentWithContent(Document):
     pdf_author: Optional[str] = None
     pdf_subject: Optional[str] = None
 
+class DocumentPage(BaseModel):
+    page_number: int
+    text: Optional[str] = None
+    word_count: Optional[int] = None
+    char_count: Optional[int] = None
+    extraction_engine: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class SearchHit(BaseModel):
+    document_id: int
+    original_filename: str
+    page_number: Optional[int] = None
+    snippet: str  # HTML-escaped page text, matches wrapped in <mark>
+    score: float
+
 # Summary Schemas
 class SummaryBase(BaseModel):
     summary_text: str
@@ -153,6 +171,8 @@ class AnalysisResult(BaseModel):
     keywords: List[Keyword] = []
     processing_status: str
     error_message: Optional[str] = None
+    stage_timings: Dict[str, float] = {}  # milliseconds per processing stage
+    token_usage: Dict[str, int] = {}  # LLM tokens spent on this document
 
 class DocumentAnalysis(BaseModel):
     document: Document
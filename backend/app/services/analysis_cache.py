@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """Content-addressed store of extraction/summary/keyword results keyed by PDF SHA-256."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # content_hash -> entry size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def make_key(content_hash: str, config: Dict[str, Any]) -> str:
+        """Cache key of a PDF analysed under a given configuration; other settings miss."""
+        fingerprint = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return f"{content_hash}-{fingerprint}"
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{content_hash}.json"
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files on disk, oldest first."""
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            content_hash, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                self._entry_path(content_hash).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for a PDF hash, or None."""
+        with self._lock:
+            if content_hash not in self._entries:
+                self.misses += 1
+                return None
+
+            try:
+                with open(self._entry_path(content_hash), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Dropping unreadable cache entry {content_hash}: {e}")
+                self._total_bytes -= self._entries.pop(content_hash)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(content_hash)
+            self.hits += 1
+            return data
+
+    def put(self, content_hash: str, data: Dict[str, Any]):
+        """Store the analysis for a PDF hash, evicting old entries if needed."""
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            logger.info(f"Analysis for {content_hash} too large to cache ({len(payload)} bytes)")
+            return
+
+        with self._lock:
+            path = self._entry_path(content_hash)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+            self._total_bytes -= self._entries.pop(content_hash, 0)
+            self._entries[content_hash] = len(payload)
+            self._total_bytes += len(payload)
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+# Global instance
+analysis_cache = AnalysisCache(settings.ANALYSIS_CACHE_DIR, settings.ANALYSIS_CACHE_MAX_BYTES)
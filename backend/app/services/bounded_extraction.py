@@ -0,0 +1,307 @@
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.pdf_processor import pdf_processor
+
+try:
+    import psutil
+except ImportError:  # optional - /proc is used on Linux without it
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+def _extraction_worker(file_path: str, start_page: int, parallel: bool, conn):
+    """
+    Isolated worker: send metadata, then one message per page from index start_page.
+    Pages come from PDFProcessor.iter_pages, so large documents are sharded over
+    its process pool and weak pages retried with pdfplumber as in the unbounded path.
+    """
+    if hasattr(os, "setpgid"):
+        # Own process group, so the parent can stop the pool's processes along with this one
+        os.setpgid(0, 0)
+    if "fork" in multiprocessing.get_all_start_methods():
+        # A spawned child would spawn its pool too, re-importing the app in every pool process;
+        # this worker has no threads yet, so forking it is safe and much faster
+        multiprocessing.set_start_method("fork", force=True)
+    if not parallel:
+        # One page at a time, each sent as soon as it is done, so a stall points at its page
+        pdf_processor.extraction_workers = 1
+        pdf_processor.shard_size = 1
+
+    try:
+        with pdf_processor.open_session(file_path) as session:
+            is_valid, message = pdf_processor.validate_session(session)
+            conn.send(("meta", is_valid, message, dict(session.metadata)))
+            if not is_valid:
+                return
+
+            for page_no, raw_text, cleaned_page in pdf_processor.iter_pages(session, start_page):
+                engine = session.page_engines.get(page_no, "pymupdf")
+                conn.send(("page", page_no, len(raw_text.strip()), cleaned_page, engine))
+
+        conn.send(("done",))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        pdf_processor.shutdown()
+        conn.close()
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process and its children, or None when it cannot be measured."""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return None
+
+    # Without psutil: every process in the worker's process group (Linux /proc)
+    try:
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        total = 0
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # Fields after the parenthesised command name: state, ppid, pgrp, ...
+                    pgrp = int(f.read().rsplit(")", 1)[1].split()[2])
+                if pgrp != pid and int(entry) != pid:
+                    continue
+                with open(f"/proc/{entry}/statm") as f:
+                    total += int(f.read().split()[1]) * page_size
+            except (OSError, ValueError, IndexError):
+                continue
+        return total or None
+    except OSError:
+        return None
+
+class BoundedExtractor:
+    """
+    Run PDF extraction in an isolated worker process under a wall-clock budget,
+    a per-page timeout and an RSS ceiling. The worker uses the same sharded
+    extraction and pdfplumber retries as PDFProcessor. When it stalls while
+    sharding, a sequential worker resumes at the same page so the page at fault
+    can be told apart; a page that hits a limit then is skipped and a fresh
+    worker resumes after it. When the budget runs out the pages extracted so
+    far are returned with the rest marked as skipped. PDFs below the isolation
+    thresholds are extracted in-process, the worker start-up would dominate.
+    """
+
+    def __init__(self):
+        self.budget_seconds = settings.PDF_EXTRACTION_BUDGET_SECONDS
+        self.page_timeout_seconds = settings.PDF_PAGE_TIMEOUT_SECONDS
+        self.max_rss_bytes = settings.PDF_WORKER_MAX_RSS_MB * 1024 * 1024
+        self.isolation_min_pages = settings.PDF_ISOLATION_MIN_PAGES
+        self.isolation_min_bytes = settings.PDF_ISOLATION_MIN_MB * 1024 * 1024
+        self.poll_interval = 0.1
+        self._context = multiprocessing.get_context("spawn")
+
+    def needs_isolation(self, file_path: Path) -> bool:
+        """Whether a PDF is large enough to be worth starting a worker process for."""
+        try:
+            if file_path.stat().st_size >= self.isolation_min_bytes:
+                return True
+            # Opening only reads the page tree, no page is parsed here
+            with pdf_processor.open_session(file_path) as session:
+                return session.page_count >= self.isolation_min_pages
+        except Exception:
+            return True  # a file that does not even open is left to the worker to contain
+
+    def _stall_timeout(self, parallel: bool) -> float:
+        """Seconds without a page message before the worker counts as stalled."""
+        if not parallel:
+            return self.page_timeout_seconds
+        # Sharded, pages arrive a whole window (shard_size pages, pdfplumber retries
+        # included) at a time; keep half the budget for a page-by-page rerun
+        return min(self.page_timeout_seconds * pdf_processor.shard_size, self.budget_seconds / 2)
+
+    def _start_worker(self, file_path: Path, start_page: int, parallel: bool):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        # Not a daemon: daemonic processes may not start the extraction pool
+        process = self._context.Process(
+            target=_extraction_worker,
+            args=(str(file_path), start_page, parallel, child_conn),
+            daemon=False
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _stop_worker(self, process, conn, finished: bool = False):
+        conn.close()
+        if finished:
+            # Let a worker that is done shut its pool down cleanly
+            process.join(timeout=5)
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)  # the worker and its pool
+            except (ProcessLookupError, PermissionError):
+                pass
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=5)
+
+    def process_pdf(self, file_path: Path) -> Dict[str, Any]:
+        """Bounded counterpart of PDFProcessor.process_pdf; marks skipped pages instead of hanging."""
+        if not self.needs_isolation(file_path):
+            return pdf_processor.process_pdf(file_path)
+
+        deadline = time.monotonic() + self.budget_seconds
+        metadata = None
+        page_count = None
+        pages: Dict[int, Dict[str, Any]] = {}
+        raw_char_count = 0
+        skipped: List[int] = []
+        limit_reached = None
+        next_page = 0  # pages completed so far, i.e. the 0-based index a new worker starts at
+        parallel = True  # sharded until a worker stalls
+
+        while page_count is None or next_page < page_count:
+            if time.monotonic() >= deadline:
+                limit_reached = "budget"
+                break
+
+            process, conn = self._start_worker(file_path, next_page, parallel)
+            stall_timeout = self._stall_timeout(parallel)
+            last_progress = time.monotonic()
+            outcome = None
+
+            try:
+                while outcome is None:
+                    if conn.poll(self.poll_interval):
+                        try:
+                            message = conn.recv()
+                        except EOFError:
+                            outcome = "crashed"
+                            break
+
+                        if message[0] == "meta":
+                            _, is_valid, error, meta = message
+                            if not is_valid:
+                                return {'success': False, 'error': error, 'text': '', 'metadata': {}}
+                            metadata = meta
+                            page_count = meta.get('page_count', 0)
+                        elif message[0] == "page":
+                            _, page_no, raw_chars, cleaned_page, engine = message
+                            pages[page_no] = {'page_number': page_no, 'text': cleaned_page, 'engine': engine}
+                            raw_char_count += raw_chars
+                            next_page = page_no
+                        elif message[0] == "done":
+                            outcome = "done"
+                        elif message[0] == "error":
+                            logger.error(f"Extraction worker error: {message[1]}")
+                            outcome = "crashed"
+                        last_progress = time.monotonic()
+                        continue
+
+                    now = time.monotonic()
+                    rss = _rss_bytes(process.pid)
+                    if now >= deadline:
+                        outcome = "budget"
+                    elif now - last_progress > stall_timeout:
+                        outcome = "page_timeout"
+                    elif rss is not None and rss > self.max_rss_bytes:
+                        outcome = "memory"
+                    elif not process.is_alive() and not conn.poll():
+                        outcome = "crashed"
+            finally:
+                self._stop_worker(process, conn, finished=outcome == "done")
+
+            if outcome == "done":
+                break
+
+            if page_count is None:
+                # The worker died before it could even open the document
+                return {
+                    'success': False,
+                    'error': f'PDF extraction failed ({outcome})',
+                    'text': '',
+                    'metadata': {}
+                }
+
+            if outcome == "budget":
+                limit_reached = "budget"
+                break
+
+            if parallel:
+                # The stall is somewhere in the pages in flight; find it sequentially
+                logger.warning(f"Extraction of {file_path.name} stalled ({outcome}), continuing page by page")
+                parallel = False
+                continue
+
+            # Skip the page the worker was stuck on and resume after it
+            limit_reached = outcome
+            logger.warning(f"Skipping page {next_page + 1} of {file_path.name}: {outcome}")
+            skipped.append(next_page + 1)
+            next_page += 1
+
+        if page_count is None:
+            return {
+                'success': False,
+                'error': 'PDF extraction exceeded its time budget',
+                'text': '',
+                'metadata': {}
+            }
+
+        # Everything not extracted by now was cut off by the budget
+        skipped = sorted(set(skipped) | {
+            page_no for page_no in range(1, page_count + 1) if page_no not in pages
+        })
+        if skipped:
+            logger.warning(f"{file_path.name}: {len(skipped)} of {page_count} pages skipped ({limit_reached})")
+
+        return self._build_result(metadata, page_count, pages, skipped, raw_char_count, limit_reached)
+
+    def _build_result(self, metadata, page_count, pages, skipped, raw_char_count, limit_reached) -> Dict[str, Any]:
+        """Assemble a process_pdf-shaped result from the pages received."""
+        ordered_pages = []
+        cleaned_pages = []
+        word_count = 0
+        for page_no in range(1, page_count + 1):
+            page = pages.get(page_no, {'page_number': page_no, 'text': '', 'engine': 'skipped'})
+            ordered_pages.append(page)
+            if page['text']:
+                cleaned_pages.append(page['text'])
+                word_count += len(page['text'].split())
+
+        cleaned_text = '\n'.join(cleaned_pages)
+        page_engines = [page['engine'] for page in ordered_pages]
+
+        if raw_char_count < 50:
+            return {
+                'success': False,
+                'error': 'Could not extract sufficient text from PDF',
+                'text': '',
+                'metadata': metadata,
+                'skipped_pages': skipped
+            }
+
+        return {
+            'success': True,
+            'text': cleaned_text,
+            'metadata': metadata,
+            'word_count': word_count,
+            'char_count': len(cleaned_text),
+            'page_engines': page_engines,
+            'fallback_pages': [n for n, engine in enumerate(page_engines, start=1) if engine == "pdfplumber"],
+            'pages': ordered_pages,
+            'partial': bool(skipped),
+            'skipped_pages': skipped,
+            'limit_reached': limit_reached
+        }
+
+# Global instance
+bounded_extractor = BoundedExtractor()
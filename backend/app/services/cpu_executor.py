@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CPUExecutor:
+    """
+    Runs CPU-bound NLP work (YAKE, NLTK tokenizing) off the event loop in a
+    thread or process pool. At most max_queue calls are queued or running;
+    further callers wait for a slot, which applies backpressure instead of
+    letting the pool's internal queue grow without bound.
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int):
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self) -> Executor:
+        """Create the pool on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="nlp-cpu")
+            return self._executor
+
+    def shutdown(self):
+        """Stop the pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Await fn(*args) computed in the pool; fn must be picklable in process mode."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+
+        # Wait for a slot before anything is handed to the pool
+        self.pending += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.pending -= 1
+
+        self.running += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "waiting": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task - the delay every request sees."""
+
+    def __init__(self, interval: float, window: int = 600):
+        self.interval = interval
+        self._samples: "deque[float]" = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0}
+        return {
+            "samples": len(samples),
+            "last_ms": round(self._samples[-1] * 1000, 2),
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+        }
+
+# Global instances
+cpu_executor = CPUExecutor(settings.NLP_EXECUTOR, settings.NLP_EXECUTOR_WORKERS, settings.NLP_EXECUTOR_MAX_QUEUE)
+loop_lag_monitor = EventLoopLagMonitor(settings.LOOP_LAG_INTERVAL_SECONDS)
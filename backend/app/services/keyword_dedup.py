@@ -0,0 +1,154 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+# Indonesian affixes, longest first within each group
+_ID_POSSESSIVES = ("nya", "ku", "mu")
+_ID_SUFFIXES = ("kan", "an")  # not -i: it would cut loanwords such as teknologi, informasi
+_ID_PREFIXES = ("meng", "peng", "meny", "peny", "mem", "pem", "men", "pen", "ber", "ter", "per",
+                "me", "pe", "di", "ke", "se")
+_MIN_STEM = 4
+
+@lru_cache(maxsize=65536)
+def stem_id(word: str) -> str:
+    """Light Indonesian stemmer: a possessive, one suffix and up to two prefixes."""
+    for group in (_ID_POSSESSIVES, _ID_SUFFIXES):
+        for affix in group:
+            if word.endswith(affix) and len(word) - len(affix) >= _MIN_STEM:
+                word = word[:-len(affix)]
+                break
+    for _ in range(2):
+        for prefix in _ID_PREFIXES:
+            if word.startswith(prefix) and len(word) - len(prefix) >= _MIN_STEM:
+                # meny-/peny- replace an initial s: menyusun -> susun
+                word = "s" + word[4:] if prefix in ("meny", "peny") else word[len(prefix):]
+                break
+        else:
+            break
+    return word
+
+@lru_cache(maxsize=65536)
+def stem_en(word: str) -> str:
+    """Light English stemmer: plurals and -ing/-ed, enough to merge inflected phrases."""
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3:
+        word = word[:-1]
+
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM - 1:
+            word = word[:-len(suffix)]
+            # learning -> learn, but running -> run
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    return word
+
+_STEMMERS = {"id": stem_id, "en": stem_en}
+
+def phrase_key(phrase: str, language: str = "id") -> Tuple[str, ...]:
+    """Stemmed token sequence of a phrase; reduplications (jaringan-jaringan) collapse to one token."""
+    stem = _STEMMERS.get(language, stem_id)
+    key: List[str] = []
+    for token in _TOKEN.findall(phrase.lower()):
+        token = stem(token)
+        if not key or key[-1] != token:
+            key.append(token)
+    return tuple(key)
+
+class KeywordTrie:
+    """
+    Token trie of accepted keyword phrases. Every suffix of an accepted phrase
+    is inserted, so both "candidate occurs inside an accepted phrase" and
+    "candidate contains an accepted phrase" are answered by walking the trie
+    from each token of the candidate: O(L²) per phrase for phrases of L
+    tokens, independent of how many phrases were accepted.
+    """
+
+    _END = ""  # child key marking the end of a whole accepted phrase
+
+    def __init__(self, language: str = "id"):
+        self.language = language
+        self._root: Dict[str, Any] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def key(self, phrase: str) -> Tuple[str, ...]:
+        return phrase_key(phrase, self.language)
+
+    def _walk(self, tokens: Iterable[str]) -> Optional[Dict[str, Any]]:
+        node = self._root
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return None
+        return node
+
+    def get(self, phrase: str) -> Any:
+        """Value stored for a phrase with the same stemmed key, or None."""
+        node = self._walk(self.key(phrase))
+        return node.get(self._END) if node is not None else None
+
+    def find_overlap(self, phrase: str) -> Any:
+        """Value of an accepted phrase that contains, equals or is contained in phrase, or None."""
+        key = self.key(phrase)
+        if not key:
+            return None
+
+        # phrase occurs inside an accepted phrase: the suffix paths contain it
+        node = self._walk(key)
+        if node is not None:
+            return node.get(self._END, node.get("\0"))
+
+        # phrase contains an accepted phrase: one starts at some token of phrase
+        for start in range(len(key)):
+            node = self._root
+            for token in key[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                if self._END in node:
+                    return node[self._END]
+        return None
+
+    def insert(self, phrase: str, value: Any = True) -> bool:
+        """Insert phrase even if it overlaps others; an identical key keeps its first value."""
+        key = self.key(phrase)
+        if not key:
+            return False
+        for start in range(len(key)):
+            node = self._root
+            for token in key[start:]:
+                node = node.setdefault(token, {})
+                # "\0" remembers which whole phrase this suffix path came from
+                node.setdefault("\0", value)
+            if start == 0:
+                if self._END in node:
+                    return False
+                node[self._END] = value
+        self._count += 1
+        return True
+
+    def add(self, phrase: str, value: Any = True) -> bool:
+        """Insert phrase unless it overlaps an accepted one; True when inserted."""
+        if self.find_overlap(phrase) is not None:
+            return False
+        return self.insert(phrase, value)
+
+def deduplicate_keywords(keywords: List[Dict[str, Any]], top_k: Optional[int] = None,
+                         language: str = "id") -> List[Dict[str, Any]]:
+    """Keep the first of every group of contained or near-identical keywords, in input order."""
+    trie = KeywordTrie(language)
+    result = []
+    for kw in keywords:
+        if trie.add(kw['keyword'], kw):
+            result.append(kw)
+            if top_k is not None and len(result) >= top_k:
+                break
+    return result
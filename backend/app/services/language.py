@@ -0,0 +1,47 @@
+import logging
+import re
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'[^\W\d_]+')
+
+# High-frequency function words; together they make up a large, stable share of running text
+_STOPWORDS: Dict[str, frozenset] = {
+    "id": frozenset("""
+        yang dan di dari ini itu dengan untuk pada dalam adalah tidak ke akan juga atau oleh
+        karena dapat sebagai lebih telah sudah bahwa mereka kami kita ada secara tersebut
+        serta antara maka saat setelah sehingga namun jika hanya bagi sangat tentang
+    """.split()),
+    "en": frozenset("""
+        the of and to in is that for it as was with be by on not this are at from or an
+        which have has had were but their its been can also these such than other into
+        more however between both there would may only when
+    """.split()),
+}
+
+class LanguageDetector:
+    """Stopword-ratio language detection for the languages the keyword extractors support."""
+
+    def __init__(self, sample_chars: int = 20000, min_ratio: float = 0.05, default: str = "id"):
+        self.sample_chars = sample_chars
+        self.min_ratio = min_ratio
+        self.default = default
+
+    def detect(self, text: str) -> str:
+        """'id' or 'en', whichever stopword list covers more of the text; default when unclear."""
+        words = _WORD.findall(text[:self.sample_chars].lower())
+        if not words:
+            return self.default
+
+        ratios = {
+            language: sum(word in stopwords for word in words) / len(words)
+            for language, stopwords in _STOPWORDS.items()
+        }
+        language = max(ratios, key=ratios.get)
+        if ratios[language] < self.min_ratio:
+            return self.default
+        return language
+
+# Global instance
+language_detector = LanguageDetector()
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """SQLite-backed cache of LLM completions with TTL expiry and LRU eviction under a size cap."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_created_at ON llm_responses (created_at)")
+        self._conn.commit()
+
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def make_key(model: str, messages: Any, params: Dict[str, Any]) -> str:
+        """SHA-256 of the canonical JSON of everything that determines the response."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses WHERE created_at < ?", (cutoff,)
+        ).fetchone()
+        if expired[0]:
+            self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (cutoff,))
+            self.expirations += expired[0]
+            self._total_bytes -= expired[1]
+
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_responses ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached completion text, or None when missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, size, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            content, size, created_at = row
+            now = time.time()
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return content
+
+    def put(self, key: str, content: str):
+        """Store a completion, evicting old entries if needed."""
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            now = time.time()
+            previous = self._conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self._total_bytes -= previous[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, content, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, content, size, now, now)
+            )
+            self._total_bytes += size
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+# Global instance
+llm_cache = LLMCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_TTL_SECONDS)
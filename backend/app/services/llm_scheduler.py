@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, lower is served first
+INTERACTIVE = 0
+BATCH = 1
+
+_LANE_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+class TokenBucket:
+    """Budget of `capacity` units per minute, refilled continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.available
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def settle(self, charged: float, actual: float):
+        """Return (or charge) the difference once the real cost of a `take(charged)` is known."""
+        self._refill()
+        # take() never charged more than the capacity, so settle against what it did charge
+        self.available = min(self.capacity, self.available + min(charged, self.capacity) - actual)
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "event", "queued_at")
+
+    def __init__(self, priority: int, seq: int, tokens: float):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.event = asyncio.Event()
+        self.queued_at = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class LLMScheduler:
+    """
+    Client-side admission control for the Groq API: requests-per-minute and
+    tokens-per-minute budgets, priority lanes (interactive before batch, FIFO
+    within a lane) and jittered exponential backoff when the API answers 429.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_retries: int, backoff_base: float, backoff_max: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+
+        self.completed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._wait_total = {INTERACTIVE: 0.0, BATCH: 0.0}
+        self._wait_count = {INTERACTIVE: 0, BATCH: 0}
+        self._wait_max = {INTERACTIVE: 0.0, BATCH: 0.0}
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+        """Rough prompt + completion size: ~4 characters per token."""
+        prompt_chars = sum(len(message.get("content", "")) for message in messages)
+        return prompt_chars // 4 + (max_tokens or 0)
+
+    def _wake_head(self):
+        if self._waiting:
+            self._waiting[0].event.set()
+
+    async def _acquire(self, tokens: float, priority: int):
+        """Wait until this request is first in line and both budgets allow it."""
+        waiter = _Waiter(priority, next(self._seq), tokens)
+        previous_head = self._waiting[0] if self._waiting else None
+        heapq.heappush(self._waiting, waiter)
+        if previous_head is not None and self._waiting[0] is waiter:
+            # Overtaken: the old head stops its budget wait and queues behind us
+            previous_head.event.set()
+        try:
+            while True:
+                if self._waiting[0] is waiter:
+                    delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if delay <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        heapq.heappop(self._waiting)
+                        self._record_wait(priority, time.monotonic() - waiter.queued_at)
+                        self._wake_head()
+                        return
+                    try:
+                        # Woken early if a higher priority request overtakes us
+                        await asyncio.wait_for(waiter.event.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await waiter.event.wait()
+                waiter.event.clear()
+        except BaseException:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                heapq.heapify(self._waiting)
+                self._wake_head()
+            raise
+
+    def _record_wait(self, priority: int, waited: float):
+        self._wait_total[priority] += waited
+        self._wait_count[priority] += 1
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Retry-After when the API sends one, else jittered exponential backoff."""
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    async def run(self, call: Callable[[], Awaitable[Any]], estimated_tokens: int, priority: int = BATCH) -> Any:
+        """Run an API call once the budgets allow it, retrying on 429."""
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens, priority)
+            try:
+                response = await call()
+            except Exception as e:
+                if getattr(e, "status_code", None) != 429 or attempt >= self.max_retries:
+                    self.failed += 1
+                    raise
+                self.rate_limited += 1
+                self.retries += 1
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                logger.warning(f"Groq rate limited, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            # Settle the token budget with the real usage when the API reports it
+            usage = getattr(response, "usage", None)
+            total_tokens = getattr(usage, "total_tokens", None)
+            if isinstance(total_tokens, int):
+                self.tokens.settle(estimated_tokens, total_tokens)
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+            self.completed += 1
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        self.requests._refill()
+        self.tokens._refill()
+        lanes = {}
+        for priority, name in _LANE_NAMES.items():
+            count = self._wait_count[priority]
+            lanes[name] = {
+                "queued": sum(1 for waiter in self._waiting if waiter.priority == priority),
+                "admitted": count,
+                "avg_wait_ms": round(self._wait_total[priority] / count * 1000, 1) if count else 0.0,
+                "max_wait_ms": round(self._wait_max[priority] * 1000, 1),
+            }
+        return {
+            "queue_depth": len(self._waiting),
+            "lanes": lanes,
+            "completed": self.completed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "requests_available": round(self.requests.available, 1),
+            "tokens_available": round(self.tokens.available),
+        }
+
+# Global instance
+llm_scheduler = LLMScheduler(
+    settings.GROQ_REQUESTS_PER_MINUTE,
+    settings.GROQ_TOKENS_PER_MINUTE,
+    settings.GROQ_MAX_RETRIES,
+    settings.GROQ_BACKOFF_BASE_SECONDS,
+    settings.GROQ_BACKOFF_MAX_SECONDS
+)
@@ -1,7 +1,14 @@
 import asyncio
+import bisect
+import contextvars
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, Iterator, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 import yake
@@ -11,9 +18,74 @@ from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
 
 from app.core.config import settings
+from app.services.cpu_executor import cpu_executor
+from app.services.keyword_dedup import KeywordTrie, deduplicate_keywords
+from app.services.language import language_detector
+from app.services.llm_cache import llm_cache
+from app.services.llm_scheduler import BATCH, INTERACTIVE, llm_scheduler
+from app.services.retrieval import chunk_text, retrieval_service
+from app.services.single_flight import SingleFlight
+from app.services.text_cleaner import text_cleaner
 
 logger = logging.getLogger(__name__)
 
+QA_MODEL = "llama-3.1-8b-instant"
+
+# Result methods produced by the LLM, as opposed to local fallbacks (extractive summary, YAKE only)
+LLM_SUMMARY_METHODS = {"groq_llama", "groq_map_reduce", "groq_merged"}
+LLM_KEYWORD_METHODS = {"hybrid_yake_llm", "llm_generated"}
+
+# Token usage of the Groq calls made under track_token_usage(); tasks started
+# from there (gathered stages, single-flight calls) share the same dict
+_token_usage: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("token_usage", default=None)
+
+# Additional specific rejections based on your examples
+KEYWORD_SPECIFIC_REJECTS = [
+    'corresponding', 'author', 'copyright', 'name', 'informatics',
+    'software engineering', 'software', 'engineering', 'kuliner',
+    'solideo', 'all authors', 'the'
+]
+
+# Reject common patterns
+KEYWORD_REJECT_PATTERNS = [
+    r'^\d+$',  # Only numbers
+    r'^[a-z]{1,2}$',  # Single or two letters
+    r'\b(the|and|or|for|of|to|in|on|at|by|with|from|that|this|which)\b',  # Common English
+    r'\b(dan|atau|untuk|dari|ke|di|pada|oleh|dengan|yang|ini|itu)\b',  # Common Indonesian
+    r'^(fig|figure|table|tabel)\s*\d*$',  # Figure/table references
+    r'^section\s*\d*$',  # Section references
+    r'@|©|®|™|\|',  # Special symbols
+    r'\b(page|pp|vol|issue|doi|issn)\b',  # Journal metadata
+    r'^(author|copyright|corresponding|name)\b',  # Specific rejects
+]
+
+# Section markers used to pick keyword windows in long documents
+KEYWORD_BACK_MATTER = re.compile(
+    r'(?im)^[ \t]*(?:\d+\.?[ \t]*)?(?:references|bibliography|daftar pustaka|referensi|appendix|lampiran)[ \t]*:?[ \t]*$'
+)
+KEYWORD_ABSTRACT = re.compile(r'(?im)^[ \t]*(?:abstract|abstrak)\b')
+KEYWORD_INTRODUCTION = re.compile(r'(?im)^[ \t]*(?:(?:\d+|I)\.?[ \t]*)?(?:introduction|pendahuluan)\b')
+KEYWORD_HEADING = re.compile(r'^(?:\d+(?:\.\d+)*\.?\s+[A-Z][^.!?]{2,80}|[A-Z][A-Z \-]{3,80})$')
+
+def _trie_regex(phrases) -> str:
+    """Alternation of literal phrases factored into a prefix trie, so matching
+    at each position walks one branch instead of trying every phrase."""
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: Dict[str, Any]) -> str:
+        # A shorter phrase ending here already proves "contains a phrase"
+        if "" in node:
+            return ""
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return render(trie)
+
 class NLPService:
     def __init__(self):
         """Initialize NLP service with Groq client"""
@@ -21,11 +93,19 @@ class NLPService:
         
         # Initialize Groq if API key is provided
         if hasattr(settings, 'GROQ_API_KEY') and settings.GROQ_API_KEY:
-            self.groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+            # No SDK retries: llm_scheduler is the only retry layer, so every
+            # HTTP attempt is charged to the RPM/TPM budgets
+            self.groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
             logger.info("Groq client initialized")
         else:
             logger.warning("No Groq API key found. Using fallback methods only.")
         
+        # Concurrent identical LLM requests are coalesced onto one call
+        self.single_flight = SingleFlight()
+        
+        # Bounds concurrent batch summaries across all documents
+        self._summary_semaphore = asyncio.Semaphore(settings.SUMMARY_MAX_CONCURRENCY)
+        
         # Initialize NLTK data
         self._ensure_nltk_data()
         
@@ -63,25 +143,31 @@ class NLPService:
             # Specific issues from your example
             'kuliner', 'solideo', 'solideo kuliner'
         }
+        self._keyword_reject = self._build_keyword_reject_matcher()
         
-        # Initialize YAKE keyword extractor for Indonesian and English
-        self.yake_extractor = yake.KeywordExtractor(
-            lan="id",  # Indonesian language
-            n=3,  # n-gram size
-            dedupLim=0.9,  # higher deduplication threshold
-            top=20,  # extract more, then filter
-            features=None,
-            stopwords=None
-        )
-        # Fallback extractor for English documents
-        self.yake_extractor_en = yake.KeywordExtractor(
-            lan="en",
-            n=3,
-            dedupLim=0.9,
-            top=20,
-            features=None,
-            stopwords=None
-        )
+        # YAKE extractors per (language, top), built once and reused for every document
+        self._yake_extractors: Dict[Tuple[str, int], yake.KeywordExtractor] = {}
+        self._yake_lock = threading.Lock()
+        for lang_code in ("id", "en"):
+            self._get_yake_extractor(lang_code, 30)
+
+    def _get_yake_extractor(self, lang_code: str, top_k: int) -> yake.KeywordExtractor:
+        """Cached, preconfigured YAKE extractor for a language"""
+        with self._yake_lock:
+            extractor = self._yake_extractors.get((lang_code, top_k))
+            if extractor is None:
+                extractor = yake.KeywordExtractor(
+                    lan=lang_code,
+                    n=2,  # Reduce n-gram size to get more focused keywords
+                    dedupLim=0.95,  # Very high deduplication
+                    dedupFunc='seqm',  # Use sequence matcher for better dedup
+                    windowsSize=1,  # Smaller window for more specific keywords
+                    top=top_k,  # Extract candidates
+                    features=None,
+                    stopwords=list(self.academic_stopwords)  # Use our custom stopwords
+                )
+                self._yake_extractors[(lang_code, top_k)] = extractor
+            return extractor
 
     def _ensure_nltk_data(self):
         """Ensure required NLTK data is downloaded"""
@@ -97,6 +183,60 @@ class NLPService:
             logger.info("Downloading NLTK stopwords...")
             nltk.download('stopwords', quiet=True)
 
+    async def _chat_completion(self, model: str, messages: List[Dict[str, str]],
+                               priority: int = BATCH, **params) -> str:
+        """Chat completion text, served from the LLM response cache when an identical request was made before"""
+        key = llm_cache.make_key(model, messages, params)
+        if settings.LLM_CACHE_ENABLED:
+            cached = await asyncio.to_thread(llm_cache.get, key)
+            if cached is not None:
+                self._record_usage(None)
+                return cached
+
+        # Identical requests already in flight share one Groq call
+        return await self.single_flight.do(
+            key, lambda: self._request_completion(key, model, messages, params, priority)
+        )
+
+    async def _request_completion(self, key: str, model: str, messages: List[Dict[str, str]],
+                                  params: Dict[str, Any], priority: int) -> str:
+        # Rate limits are applied client-side; interactive requests go first
+        response = await llm_scheduler.run(
+            lambda: self.groq_client.chat.completions.create(model=model, messages=messages, **params),
+            estimated_tokens=llm_scheduler.estimate_tokens(messages, params.get("max_tokens")),
+            priority=priority
+        )
+        content = response.choices[0].message.content or ""
+        self._record_usage(getattr(response, "usage", None))
+
+        if settings.LLM_CACHE_ENABLED and content:
+            await asyncio.to_thread(llm_cache.put, key, content)
+        return content
+
+    @contextmanager
+    def track_token_usage(self) -> Iterator[Dict[str, int]]:
+        """Collect the token usage of every LLM call made inside the block (and tasks it starts)"""
+        usage = {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        token = _token_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _token_usage.reset(token)
+
+    def _record_usage(self, usage: Any):
+        """Add one response's usage to the tracked totals; None records a cache hit"""
+        totals = _token_usage.get()
+        if totals is None:
+            return
+        if usage is None:
+            totals["cache_hits"] += 1
+            return
+        totals["calls"] += 1
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                totals[field] += value
+
     async def summarize_text(self, text: str, max_length: int = 500) -> Dict[str, Any]:
         """
         Generate summary using LLM API
@@ -111,6 +251,8 @@ class NLPService:
 
             # Use Groq (Llama model) if available
             if self.groq_client:
+                if settings.SUMMARY_MAP_REDUCE and len(text) > settings.SUMMARY_BATCH_CHARS:
+                    return await self._summarize_map_reduce(text, max_length)
                 return await self._summarize_with_groq(text, max_length)
             else:
                 # Fallback to simple extraction if no Groq API key
@@ -128,7 +270,7 @@ class NLPService:
         1. Ringkasan yang ringkas (maksimal {max_length} kata)
         2. 3-5 poin utama yang menyoroti temuan/wawasan utama
 
-        Teks: {text[:8000]}  # Limit input to avoid token limits
+        Teks: {text[:settings.SUMMARY_BATCH_CHARS]}  # Limit input to avoid token limits
 
         Format respons Anda sebagai JSON:
         {{
@@ -137,7 +279,7 @@ class NLPService:
         }}
         """
 
-        response = await self.groq_client.chat.completions.create(
+        content = await self._chat_completion(
             model="llama-3.1-8b-instant",  # Updated to current available model
             messages=[
                 {"role": "system", "content": "Anda adalah asisten penelitian yang mengkhususkan diri dalam analisis dokumen. Selalu berikan respons dalam bahasa Indonesia dengan format JSON yang valid."},
@@ -149,7 +291,7 @@ class NLPService:
         )
 
         try:
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             return {
                 "summary": result.get("summary", ""),
                 "bullet_points": result.get("bullet_points", []),
@@ -157,15 +299,118 @@ class NLPService:
             }
         except json.JSONDecodeError:
             # If JSON parsing fails, extract manually
-            content = response.choices[0].message.content
             return {
                 "summary": content[:max_length],
                 "bullet_points": [content[:200]],
                 "method": "groq_llama_fallback"
             }
 
+    async def _summarize_batch(self, batch: str, part: int, total: int) -> Dict[str, Any]:
+        """Summarize one batch of a long document (map step)"""
+        prompt = f"""
+        Ini adalah bagian {part} dari {total} sebuah dokumen/paper penelitian.
+        Ringkas bagian ini dalam bahasa Indonesia (maksimal 150 kata) dan sebutkan
+        2-3 poin penting dari bagian ini saja.
+
+        Teks: {batch}
+
+        Format respons Anda sebagai JSON:
+        {{
+            "summary": "ringkasan bagian ini",
+            "bullet_points": ["poin 1", "poin 2"]
+        }}
+        """
+
+        async with self._summary_semaphore:
+            content = await self._chat_completion(
+                model="llama-3.1-8b-instant",
+                messages=[
+                    {"role": "system", "content": "Anda adalah asisten penelitian yang mengkhususkan diri dalam analisis dokumen. Selalu berikan respons dalam bahasa Indonesia dengan format JSON yang valid."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=400,
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            )
+
+        result = json.loads(content)
+        return {
+            "summary": result.get("summary", ""),
+            "bullet_points": result.get("bullet_points", [])
+        }
+
+    async def _summarize_map_reduce(self, text: str, max_length: int) -> Dict[str, Any]:
+        """
+        Summarize a long text hierarchically: summarize batches concurrently
+        (bounded by the summary semaphore), then summarize the partial summaries
+        the same way until they fit in a single call.
+        """
+        level = await self._reduce_for_summary(text)
+        result = await self._summarize_with_groq(level, max_length)
+        if result["method"] == "groq_llama":
+            result["method"] = "groq_map_reduce"
+        return result
+
+    async def _reduce_for_summary(self, text: str) -> str:
+        """Map-reduce levels of batch summaries until the text fits one summary call"""
+        level = text
+        while len(level) > settings.SUMMARY_BATCH_CHARS:
+            batches = chunk_text(level, settings.SUMMARY_BATCH_CHARS, 0)
+            numbered = self._sample_batches(batches, settings.SUMMARY_MAX_BATCHES)
+            results = await asyncio.gather(
+                *(self._summarize_batch(batch, i, len(batches)) for i, batch in numbered),
+                return_exceptions=True
+            )
+
+            partials = []
+            for (i, _), result in zip(numbered, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Summary of batch {i}/{len(batches)} failed: {result}")
+                    continue
+                points = "; ".join(str(point) for point in result["bullet_points"])
+                partials.append(f"Bagian {i}: {result['summary']} Poin: {points}")
+
+            if not partials:
+                raise Exception("All batch summaries failed")
+
+            reduced = "\n\n".join(partials)
+            if len(reduced) >= len(level):
+                # Partial summaries did not get shorter; stop instead of looping
+                break
+            level = reduced
+
+        return level
+
+    def _sample_batches(self, batches: List[str], max_batches: int) -> List[Tuple[int, str]]:
+        """
+        (1-based index, batch) pairs to summarize. Above max_batches, the number
+        kept grows with the square root of the batch count (the geometric mean
+        of the two), so calls and tokens grow slower than the document while
+        long documents still get proportionate coverage. The first and last
+        batches and evenly spaced ones between them are kept.
+        """
+        numbered = list(enumerate(batches, start=1))
+        if max_batches <= 0 or len(numbered) <= max_batches:
+            return numbered
+
+        budget = math.ceil(math.sqrt(max_batches * len(numbered)))
+        if budget >= len(numbered):
+            return numbered
+        step = (len(numbered) - 1) / (budget - 1)
+        picked = sorted({round(i * step) for i in range(budget)})
+        covered = sum(len(numbered[i][1]) for i in picked) / sum(len(batch) for batch in batches)
+        logger.warning(
+            f"Summarizing {len(picked)} of {len(numbered)} batches (~{covered:.0%} of the text); "
+            f"raise SUMMARY_MAX_BATCHES (0 = all) to cover more"
+        )
+        return [numbered[i] for i in picked]
+
     async def _simple_summarization(self, text: str, max_length: int) -> Dict[str, Any]:
         """Simple summarization fallback using sentence extraction"""
+        return await cpu_executor.run(_run_nlp_method, "_extractive_summary", text, max_length)
+
+    def _extractive_summary(self, text: str, max_length: int) -> Dict[str, Any]:
+        """First sentences as summary and bullet points (CPU-bound, runs in the executor pool)"""
         sentences = sent_tokenize(text)
         
         # Take first few sentences as summary
@@ -184,36 +429,19 @@ class NLPService:
             "method": "simple_extraction"
         }
 
+    def _build_keyword_reject_matcher(self) -> "re.Pattern":
+        """One regex for every substring/pattern rejection in _is_valid_keyword"""
+        phrases = set(self.academic_stopwords) | set(KEYWORD_SPECIFIC_REJECTS)
+        return re.compile("|".join([_trie_regex(phrases)] + [f"(?:{p})" for p in KEYWORD_REJECT_PATTERNS]))
+
     def _is_valid_keyword(self, keyword: str) -> bool:
         """Check if keyword is valid and meaningful"""
-        import re
-        
         keyword_lower = keyword.lower().strip()
         
         # Reject if too short or too long
         if len(keyword_lower) < 4 or len(keyword_lower) > 50:
             return False
         
-        # Reject if in academic stopwords
-        if keyword_lower in self.academic_stopwords:
-            return False
-        
-        # Reject if contains ANY stopword phrase (more aggressive)
-        for stopword in self.academic_stopwords:
-            if stopword in keyword_lower:
-                return False
-        
-        # Additional specific rejections based on your examples
-        specific_rejects = [
-            'corresponding', 'author', 'copyright', 'name', 'informatics',
-            'software engineering', 'software', 'engineering', 'kuliner',
-            'solideo', 'all authors', 'the'
-        ]
-        
-        for reject in specific_rejects:
-            if reject in keyword_lower:
-                return False
-        
         # Reject if mostly numbers or special characters
         alpha_chars = sum(c.isalpha() for c in keyword)
         if alpha_chars < len(keyword) * 0.6:  # More strict
@@ -223,22 +451,10 @@ class NLPService:
         if keyword.isupper() and len(keyword) > 3:
             return False
         
-        # Reject common patterns
-        reject_patterns = [
-            r'^\d+$',  # Only numbers
-            r'^[a-z]{1,2}$',  # Single or two letters
-            r'\b(the|and|or|for|of|to|in|on|at|by|with|from|that|this|which)\b',  # Common English
-            r'\b(dan|atau|untuk|dari|ke|di|pada|oleh|dengan|yang|ini|itu)\b',  # Common Indonesian
-            r'^(fig|figure|table|tabel)\s*\d*$',  # Figure/table references
-            r'^section\s*\d*$',  # Section references
-            r'@|©|®|™|\|',  # Special symbols
-            r'\b(page|pp|vol|issue|doi|issn)\b',  # Journal metadata
-            r'^(author|copyright|corresponding|name)\b',  # Specific rejects
-        ]
-        
-        for pattern in reject_patterns:
-            if re.search(pattern, keyword_lower):
-                return False
+        # Reject if it contains any stopword phrase or specific reject, or
+        # matches a reject pattern - all compiled into one regex
+        if self._keyword_reject.search(keyword_lower):
+            return False
         
         # Must contain at least one word with 4+ characters
         words = keyword_lower.split()
@@ -250,132 +466,171 @@ class NLPService:
     
     def _clean_text_for_keywords(self, text: str) -> str:
         """Clean text specifically for keyword extraction"""
-        import re
-        
-        # Remove common header/footer patterns (more comprehensive)
-        patterns_to_remove = [
-            # Author and copyright related
-            r'(?i)corresponding author[^\n]*',
-            r'(?i)author name[^\n]*',
-            r'(?i)all authors[^\n]*',
-            r'(?i)copyright.*?(\d{4}|all rights)[^\n]*',
-            r'(?i)©.*?(\d{4}|all rights)[^\n]*',
-            r'(?i)all rights reserved[^\n]*',
-            
-            # Publishing info
-            r'(?i)published by[^\n]*',
-            r'(?i)issn[:\s]*[\d-]+[^\n]*',
-            r'(?i)doi[:\s]*[\d\.\/\-]+[^\n]*',
-            r'(?i)vol\.?\s*\d+[^\n]*',
-            r'(?i)pp\.?\s*\d+-\d+[^\n]*',
-            r'(?i)page \d+ of \d+[^\n]*',
-            
-            # Contact info
-            r'(?i)e-?mail[:\s]*[^\s]+@[^\s]+[^\n]*',
-            r'(?i)received.*?\d{4}[^\n]*',
-            r'(?i)accepted.*?\d{4}[^\n]*',
-            r'(?i)revised.*?\d{4}[^\n]*',
-            
-            # Journal names and categories
-            r'(?i)\bINFORMATICS AND SOFTWARE\b',
-            r'(?i)\bSOFTWARE ENGINEERING\b',
-            r'(?i)\bAND SOFTWARE\b',
-            
-            # Headers/footers
-            r'(?i)available online[^\n]*',
-            r'(?i)this is an open access[^\n]*',
-        ]
-        
-        cleaned = text
-        for pattern in patterns_to_remove:
-            cleaned = re.sub(pattern, ' ', cleaned)
-        
-        # Remove lines that are mostly uppercase (likely headers)
-        lines = cleaned.split('\n')
-        filtered_lines = []
-        for line in lines:
-            line_stripped = line.strip()
-            if line_stripped:
-                upper_count = sum(1 for c in line_stripped if c.isupper())
-                if upper_count < len(line_stripped) * 0.7:  # Keep if less than 70% uppercase
-                    filtered_lines.append(line)
-        
-        cleaned = '\n'.join(filtered_lines)
-        
-        return cleaned
+        return text_cleaner.clean_for_keywords(text)
 
-    async def _extract_keywords_with_yake(self, text: str, top_k: int = 30) -> List[Dict[str, Any]]:
+    async def _extract_keywords_with_yake(self, text: str, top_k: int = 30,
+                                          language: Optional[str] = None) -> List[Dict[str, Any]]:
         """Extract keywords using YAKE algorithm - returns candidates"""
+        return await cpu_executor.run(_run_nlp_method, "_yake_keywords", text, top_k, language)
+
+    def _yake_keywords(self, text: str, top_k: int, language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """YAKE candidate extraction, one pass in the document's language (CPU-bound, runs in the executor pool)"""
         try:
             # Clean text from academic artifacts
             cleaned_text = self._clean_text_for_keywords(text)
-            cleaned_text = ' '.join(cleaned_text.split())  # Remove extra whitespace
-            
-            # Create comprehensive stopwords list for YAKE
-            custom_stopwords = list(self.academic_stopwords)
-            
-            # Try Indonesian first, then English as fallback
-            extractors_to_try = [
-                ("id", "Indonesian"),
-                ("en", "English")
-            ]
-            
-            all_keywords = []
-            
-            for lang_code, lang_name in extractors_to_try:
-                try:
-                    # Use custom stopwords with YAKE
-                    extractor = yake.KeywordExtractor(
-                        lan=lang_code,
-                        n=2,  # Reduce n-gram size to get more focused keywords
-                        dedupLim=0.95,  # Very high deduplication
-                        dedupFunc='seqm',  # Use sequence matcher for better dedup
-                        windowsSize=1,  # Smaller window for more specific keywords
-                        top=top_k,  # Extract candidates
-                        features=None,
-                        stopwords=custom_stopwords  # Use our custom stopwords
-                    )
-                    
-                    keywords = extractor.extract_keywords(cleaned_text)
-                    
-                    for keyword_tuple in keywords:
-                        try:
-                            # YAKE returns (keyword, score) tuples
-                            if isinstance(keyword_tuple, tuple) and len(keyword_tuple) == 2:
-                                keyword, score = keyword_tuple
-                                keyword_str = str(keyword).strip()
-                                
-                                # Validate keyword
-                                if self._is_valid_keyword(keyword_str):
-                                    score_float = float(score)
-                                    all_keywords.append({
-                                        "keyword": keyword_str,
-                                        "score": score_float,
-                                        "method": f"yake_{lang_code}"
-                                    })
-                        except (ValueError, TypeError, IndexError) as e:
-                            logger.warning(f"Skipping invalid keyword tuple: {keyword_tuple}, error: {e}")
-                            continue
-                    
-                    if all_keywords:
-                        logger.info(f"YAKE extracted {len(all_keywords)} valid keywords using {lang_name}")
-                        break  # Use first successful extraction
-                        
-                except Exception as lang_error:
-                    logger.warning(f"YAKE failed for {lang_name}: {lang_error}")
-                    continue
+            lang_code = language or language_detector.detect(cleaned_text)
             
-            # Sort by score (lower is better in YAKE)
-            if all_keywords:
-                all_keywords.sort(key=lambda x: x['score'])
+            if settings.KEYWORD_WINDOWED:
+                windows = self._keyword_windows(
+                    cleaned_text, settings.KEYWORD_TOKEN_BUDGET, settings.KEYWORD_WINDOW_TOKENS
+                )
+            else:
+                windows = [cleaned_text]
             
+            all_keywords = self._yake_over_windows(windows, top_k, lang_code)
+            logger.info(f"YAKE extracted {len(all_keywords)} valid keywords ({lang_code}, {len(windows)} windows)")
             return all_keywords
             
         except Exception as e:
             logger.error(f"YAKE extraction error: {e}")
             return []
     
-    async def _refine_keywords_with_llm(self, text: str, yake_keywords: List[Dict[str, Any]], top_k: int = 10) -> List[Dict[str, Any]]:
+    def _yake_over_windows(self, windows: List[str], top_k: int, lang_code: str) -> List[Dict[str, Any]]:
+        """
+        Run YAKE on each window and merge the candidates. A keyword keeps its best
+        (lowest) score, divided by the number of windows it was found in so terms
+        that recur across sections rank higher; one window gives plain YAKE scores.
+        """
+        extractor = self._get_yake_extractor(lang_code, top_k)
+        merged: Dict[str, Dict[str, Any]] = {}
+        
+        for window in windows:
+            window = ' '.join(window.split())  # Remove extra whitespace
+            for keyword_tuple in extractor.extract_keywords(window):
+                try:
+                    # YAKE returns (keyword, score) tuples
+                    if isinstance(keyword_tuple, tuple) and len(keyword_tuple) == 2:
+                        keyword, score = keyword_tuple
+                        keyword_str = str(keyword).strip()
+                        
+                        # Validate keyword
+                        if not self._is_valid_keyword(keyword_str):
+                            continue
+                        
+                        entry = merged.setdefault(keyword_str.lower(), {
+                            "keyword": keyword_str, "score": float(score), "windows": 0
+                        })
+                        entry["score"] = min(entry["score"], float(score))
+                        entry["windows"] += 1
+                except (ValueError, TypeError, IndexError) as e:
+                    logger.warning(f"Skipping invalid keyword tuple: {keyword_tuple}, error: {e}")
+                    continue
+        
+        all_keywords = [
+            {
+                "keyword": entry["keyword"],
+                "score": entry["score"] / entry["windows"],
+                "method": f"yake_{lang_code}"
+            }
+            for entry in merged.values()
+        ]
+        
+        # Sort by score (lower is better in YAKE)
+        all_keywords.sort(key=lambda x: x['score'])
+        return all_keywords[:top_k]
+    
+    def _keyword_windows(self, text: str, token_budget: int, window_tokens: int) -> List[str]:
+        """
+        Bounded sample of a long document for keyword extraction: the abstract,
+        the introduction, the section headings and evenly strided body windows,
+        at most token_budget words in total. References and appendices are dropped.
+        Short documents come back whole as a single window.
+        """
+        # Drop the back matter when its heading sits in the second half
+        for match in KEYWORD_BACK_MATTER.finditer(text):
+            if match.start() > len(text) // 2:
+                text = text[:match.start()]
+                break
+        
+        spans = [(m.start(), m.end()) for m in re.finditer(r'\S+', text)]
+        if len(spans) <= token_budget:
+            return [text]
+        
+        def word_index(char_pos: int) -> int:
+            return min(bisect.bisect_left(spans, (char_pos, char_pos)), len(spans) - 1)
+        
+        windows = []
+        taken: List[Tuple[int, int]] = []  # [start, end) word ranges already sampled
+        used = 0
+        
+        def add_window(first_word: int, end_word: int):
+            nonlocal used
+            windows.append(text[spans[first_word][0]:spans[end_word - 1][1]])
+            used += end_word - first_word
+        
+        # Abstract and introduction carry most of a paper's key terms
+        for pattern in (KEYWORD_ABSTRACT, KEYWORD_INTRODUCTION):
+            match = pattern.search(text)
+            size = min(window_tokens, token_budget - used)
+            if not match or size <= 0:
+                continue
+            first_word = word_index(match.start())
+            for taken_start, taken_end in taken:
+                if taken_start <= first_word < taken_end:
+                    first_word = taken_end  # continue after the window already holding it
+            end_word = min(first_word + size, len(spans))
+            for taken_start, _ in taken:
+                if first_word < taken_start < end_word:
+                    end_word = taken_start
+            if first_word < end_word:
+                add_window(first_word, end_word)
+                taken.append((first_word, end_word))
+        
+        # Section headings as one window
+        headings = [
+            line.strip() for line in text.split('\n')
+            if KEYWORD_HEADING.match(line.strip()) and len(line.split()) <= 10
+        ]
+        size = min(window_tokens, token_budget - used)
+        if headings and size > 0:
+            heading_window = ' '.join(' '.join(headings).split()[:size])
+            windows.append(heading_window)
+            used += len(heading_window.split())
+        
+        # Spread the rest of the budget evenly over the body words not sampled yet
+        free = []
+        position = 0
+        for taken_start, taken_end in sorted(taken):
+            if position < taken_start:
+                free.append((position, taken_start))
+            position = max(position, taken_end)
+        if position < len(spans):
+            free.append((position, len(spans)))
+        free_words = sum(free_end - free_start for free_start, free_end in free)
+        
+        remaining = min(token_budget - used, free_words)
+        if remaining > 0:
+            count = -(-remaining // window_tokens)
+            sizes = [window_tokens] * (count - 1) + [remaining - window_tokens * (count - 1)]
+            slack = free_words - remaining
+            offset = 0
+            for i, size in enumerate(sizes):
+                # Window i in free-word coordinates, mapped back piece by piece
+                window_start = offset + slack * i // max(count - 1, 1)
+                window_end = window_start + size
+                offset += size
+                skipped = 0
+                for free_start, free_end in free:
+                    piece_start = max(free_start, free_start + window_start - skipped)
+                    piece_end = min(free_end, free_start + window_end - skipped)
+                    if piece_start < piece_end:
+                        add_window(piece_start, piece_end)
+                    skipped += free_end - free_start
+        
+        return windows
+    
+    async def _refine_keywords_with_llm(self, text: str, yake_keywords: List[Dict[str, Any]], top_k: int = 10,
+                                        language: Optional[str] = None) -> List[Dict[str, Any]]:
         """Use LLM to refine and select the most relevant keywords from YAKE candidates"""
         try:
             if not self.groq_client or not yake_keywords:
@@ -402,7 +657,7 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
 ["keyword1", "keyword2", "keyword3", ...]
 """
 
-            response = await self.groq_client.chat.completions.create(
+            content = await self._chat_completion(
                 model="llama-3.1-8b-instant",
                 messages=[
                     {
@@ -416,7 +671,7 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
                 response_format={"type": "json_object"}
             )
             
-            content = response.choices[0].message.content.strip()
+            content = content.strip()
             
             # Parse LLM response
             try:
@@ -435,31 +690,9 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
                     logger.warning("LLM returned empty keywords, using YAKE fallback")
                     return yake_keywords[:top_k]
                 
-                # Map back to keyword objects with scores
-                final_keywords = []
-                yake_keyword_map = {kw['keyword'].lower(): kw for kw in yake_keywords}
-                
-                for idx, keyword in enumerate(refined_keywords[:top_k]):
-                    keyword_clean = str(keyword).strip()
-                    if keyword_clean and len(keyword_clean) > 2:
-                        # Try to find in YAKE results for original score
-                        yake_kw = yake_keyword_map.get(keyword_clean.lower())
-                        if yake_kw:
-                            final_keywords.append({
-                                "keyword": keyword_clean,
-                                "score": yake_kw['score'],
-                                "method": "hybrid_yake_llm",
-                                "rank": idx + 1
-                            })
-                        else:
-                            # New keyword from LLM
-                            final_keywords.append({
-                                "keyword": keyword_clean,
-                                "score": 0.01 * (idx + 1),  # Lower score = better
-                                "method": "llm_generated",
-                                "rank": idx + 1
-                            })
-                
+                final_keywords = self._map_selected_keywords(
+                    refined_keywords, yake_keywords, top_k, language or language_detector.detect(text)
+                )
                 logger.info(f"LLM refined keywords: {len(final_keywords)} keywords selected")
                 return final_keywords
                 
@@ -472,7 +705,40 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
             # Fallback to YAKE only
             return yake_keywords[:top_k]
 
-    async def extract_keywords(self, text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+    def _map_selected_keywords(self, selected_keywords: List[Any], yake_keywords: List[Dict[str, Any]],
+                               top_k: int, language: str) -> List[Dict[str, Any]]:
+        """Map keywords picked by the LLM back to keyword objects with scores"""
+        final_keywords = []
+        yake_keyword_index = KeywordTrie(language)
+        for kw in yake_keywords:
+            yake_keyword_index.insert(kw['keyword'], kw)
+        selected = KeywordTrie(language)
+        
+        for idx, keyword in enumerate(selected_keywords[:top_k]):
+            keyword_clean = str(keyword).strip()
+            # Skip near-duplicates of a keyword the LLM already picked
+            if keyword_clean and len(keyword_clean) > 2 and selected.add(keyword_clean):
+                # Try to find in YAKE results for original score (inflections match too)
+                yake_kw = yake_keyword_index.get(keyword_clean)
+                if yake_kw:
+                    final_keywords.append({
+                        "keyword": keyword_clean,
+                        "score": yake_kw['score'],
+                        "method": "hybrid_yake_llm",
+                        "rank": idx + 1
+                    })
+                else:
+                    # New keyword from LLM
+                    final_keywords.append({
+                        "keyword": keyword_clean,
+                        "score": 0.01 * (idx + 1),  # Lower score = better
+                        "method": "llm_generated",
+                        "rank": idx + 1
+                    })
+        
+        return final_keywords
+
+    async def extract_keywords(self, text: str, top_k: int = 10, language: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Hybrid keyword extraction: YAKE + LLM
         1. YAKE extracts candidate keywords (fast, rule-based)
@@ -485,18 +751,18 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
             
             # Step 1: Extract candidates with YAKE (30 candidates)
             logger.info("Step 1: Extracting keyword candidates with YAKE...")
-            yake_keywords = await self._extract_keywords_with_yake(text, top_k=30)
+            yake_keywords = await self._extract_keywords_with_yake(text, top_k=30, language=language)
             
             if not yake_keywords:
-                logger.warning("YAKE extraction failed, no keywords found")
-                return []
+                logger.warning("YAKE found no keywords, using frequency fallback")
+                return await self._frequency_fallback(text, top_k)
             
             logger.info(f"YAKE found {len(yake_keywords)} candidate keywords")
             
             # Step 2: Refine with LLM if available
             if self.groq_client:
                 logger.info("Step 2: Refining keywords with LLM...")
-                refined_keywords = await self._refine_keywords_with_llm(text, yake_keywords, top_k)
+                refined_keywords = await self._refine_keywords_with_llm(text, yake_keywords, top_k, language)
                 
                 if refined_keywords:
                     logger.info(f"Hybrid extraction completed: {len(refined_keywords)} final keywords")
@@ -504,65 +770,170 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
             
             # Fallback: Use YAKE only with deduplication
             logger.info("Using YAKE-only results (LLM not available or failed)")
-            final_keywords = []
-            seen_keywords = set()
-            
-            for kw in yake_keywords:
-                kw_normalized = kw['keyword'].lower().strip()
-                # Check if not already added or very similar
-                is_duplicate = False
-                for seen in seen_keywords:
-                    if kw_normalized in seen or seen in kw_normalized:
-                        is_duplicate = True
-                        break
-                if not is_duplicate:
-                    final_keywords.append(kw)
-                    seen_keywords.add(kw_normalized)
-                    if len(final_keywords) >= top_k:
-                        break
-            
-            return final_keywords[:top_k]
+            # Drop keywords contained in (or inflections of) a better-ranked one
+            return deduplicate_keywords(yake_keywords, top_k, language or language_detector.detect(text))
             
         except Exception as e:
             logger.error(f"Keyword extraction error: {e}")
+            return await self._frequency_fallback(text, top_k)
+
+    async def _frequency_fallback(self, text: str, top_k: int) -> List[Dict[str, Any]]:
+        """Most frequent words when YAKE fails or finds nothing; empty if that fails too"""
+        try:
+            return await cpu_executor.run(_run_nlp_method, "_frequency_keywords", text, top_k)
+        except Exception as fallback_error:
+            logger.error(f"Fallback keyword extraction failed: {fallback_error}")
             return []
-            
-            # If both YAKE attempts failed, use simple fallback
-            logger.warning("YAKE extraction failed for all languages, using fallback")
-            raise Exception("YAKE extraction failed")
-            
+
+    async def analyze_document(self, text: str, max_length: int = 500, top_k: int = 10,
+                               language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summary and keywords from one LLM call: YAKE candidates are sent along
+        with the text and the model returns summary, bullet points and its
+        keyword picks as one JSON object. Either part that is missing or
+        malformed falls back on its own to summarize_text / keyword refinement.
+        A part that still fails is reported in "errors" without losing the other.
+        """
+        errors: Dict[str, str] = {}
+
+        if not self.groq_client or len(text.split()) < 50:
+            summary_result, keywords_result = await asyncio.gather(
+                self._analysis_part("summary", self.summarize_text(text, max_length), {}, errors),
+                self._analysis_part("keywords", self.extract_keywords(text, top_k, language), [], errors)
+            )
+            return {"summary": summary_result, "keywords": keywords_result, "errors": errors}
+
+        language = language or language_detector.detect(text)
+
+        # YAKE candidates and the map-reduce of long texts are independent
+        parts = [self._extract_keywords_with_yake(text, top_k=30, language=language)]
+        if settings.SUMMARY_MAP_REDUCE and len(text) > settings.SUMMARY_BATCH_CHARS:
+            parts.append(self._reduce_for_summary(text))
+        outcomes = await asyncio.gather(*parts, return_exceptions=True)
+
+        yake_keywords = outcomes[0]
+        if isinstance(yake_keywords, Exception):
+            logger.error(f"YAKE candidate extraction error: {yake_keywords}")
+            yake_keywords = []
+        analysis_text = outcomes[1] if len(outcomes) > 1 else text
+        if isinstance(analysis_text, Exception):
+            # The merged call then sees the first batch only; the summary fallback retries the reduction
+            logger.error(f"Summary reduction error: {analysis_text}")
+            analysis_text = text
+
+        result: Dict[str, Any] = {}
+        try:
+            result = await self._analyze_with_groq(analysis_text, yake_keywords, max_length, top_k)
         except Exception as e:
-            logger.error(f"Keyword extraction error: {e}")
-            # Simple fallback - most frequent words
-            try:
-                words = word_tokenize(text.lower())
-                stop_words = set(stopwords.words('english'))
-                filtered_words = [word for word in words if word.isalpha() and word not in stop_words and len(word) > 3]
-                
-                # Count word frequency
-                word_freq = {}
-                for word in filtered_words:
-                    word_freq[word] = word_freq.get(word, 0) + 1
-                
-                # Sort by frequency and return top keywords
-                sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-                
-                result = []
-                for word, freq in sorted_words[:top_k]:
-                    result.append({
-                        "keyword": word,
-                        "score": 1.0 / freq,  # Lower score for higher frequency (YAKE style)
-                        "method": "frequency_fallback"
-                    })
-                
-                return result
-                
-            except Exception as fallback_error:
-                logger.error(f"Fallback keyword extraction failed: {fallback_error}")
-                return []
+            logger.error(f"Merged analysis error: {e}")
+
+        summary = result.get("summary")
+        bullet_points = result.get("bullet_points")
+        if isinstance(summary, str) and summary.strip():
+            summary_result = {
+                "summary": summary,
+                "bullet_points": bullet_points if isinstance(bullet_points, list) else [],
+                "method": "groq_merged"
+            }
+        else:
+            logger.warning("Merged analysis returned no usable summary, summarizing separately")
+            summary_result = await self._analysis_part("summary", self.summarize_text(text, max_length), {}, errors)
+
+        selected_keywords = result.get("keywords")
+        keywords_result = []
+        if isinstance(selected_keywords, list):
+            keywords_result = self._map_selected_keywords(selected_keywords, yake_keywords, top_k, language)
+        if not keywords_result and yake_keywords:
+            logger.warning("Merged analysis returned no usable keywords, refining separately")
+            keywords_result = await self._analysis_part(
+                "keywords", self._refine_keywords_with_llm(text, yake_keywords, top_k, language),
+                deduplicate_keywords(yake_keywords, top_k, language), errors
+            )
+        elif not keywords_result:
+            keywords_result = await self._frequency_fallback(text, top_k)
+
+        return {"summary": summary_result, "keywords": keywords_result, "errors": errors}
+
+    async def _analysis_part(self, name: str, part: Awaitable[Any], default: Any, errors: Dict[str, str]) -> Any:
+        """Await one half of analyze_document; a failure is recorded in errors and yields default"""
+        try:
+            return await part
+        except Exception as e:
+            logger.error(f"Analysis part '{name}' failed: {e}")
+            errors[name] = str(e)
+            return default
+
+    async def _analyze_with_groq(self, text: str, yake_keywords: List[Dict[str, Any]],
+                                 max_length: int, top_k: int) -> Dict[str, Any]:
+        """One Groq call returning summary, bullet points and selected keywords as JSON"""
+        keyword_list = [kw['keyword'] for kw in yake_keywords[:20]]
+        prompt = f"""
+        Analisis dokumen/paper penelitian ini dan berikan dalam bahasa Indonesia:
+        1. Ringkasan yang ringkas (maksimal {max_length} kata)
+        2. 3-5 poin utama yang menyoroti temuan/wawasan utama
+        3. {top_k} kata kunci yang PALING mewakili topik utama, metode, atau kontribusi penelitian,
+           dipilih dari kandidat berikut; HINDARI nama jurnal, copyright, nama author, metadata.
+           Jika kandidat tidak ada yang relevan, berikan kata kunci baru dari dokumen.
+
+        KANDIDAT KATA KUNCI: {', '.join(keyword_list)}
+
+        Teks: {text[:settings.SUMMARY_BATCH_CHARS]}
+
+        Format respons Anda sebagai JSON:
+        {{
+            "summary": "ringkasan dalam bahasa Indonesia",
+            "bullet_points": ["poin 1", "poin 2", "poin 3"],
+            "keywords": ["keyword1", "keyword2", "keyword3"]
+        }}
+        """
+
+        content = await self._chat_completion(
+            model="llama-3.1-8b-instant",
+            messages=[
+                {"role": "system", "content": "Anda adalah asisten penelitian yang mengkhususkan diri dalam analisis dokumen. Selalu berikan respons dalam bahasa Indonesia dengan format JSON yang valid."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1100,
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        )
 
-    async def answer_question(self, question: str, context: str, conversation_history: List = None) -> Dict[str, Any]:
+        try:
+            result = json.loads(content)
+        except json.JSONDecodeError as json_err:
+            logger.error(f"Failed to parse merged analysis JSON: {json_err}")
+            return {}
+        return result if isinstance(result, dict) else {}
+
+    def _frequency_keywords(self, text: str, top_k: int) -> List[Dict[str, Any]]:
+        """Most frequent non-stopwords as keywords (CPU-bound, runs in the executor pool)"""
+        words = word_tokenize(text.lower())
+        stop_words = set(stopwords.words('english'))
+        filtered_words = [word for word in words if word.isalpha() and word not in stop_words and len(word) > 3]
+        
+        # Count word frequency
+        word_freq = {}
+        for word in filtered_words:
+            word_freq[word] = word_freq.get(word, 0) + 1
+        
+        # Sort by frequency and return top keywords
+        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
+        
+        result = []
+        for word, freq in sorted_words[:top_k]:
+            result.append({
+                "keyword": word,
+                "score": 1.0 / freq,  # Lower score for higher frequency (YAKE style)
+                "method": "frequency_fallback"
+            })
+        
+        return result
+
+    async def answer_question(self, question: str, context: Optional[str] = None,
+                              conversation_history: List = None, document_id: Optional[int] = None) -> Dict[str, Any]:
         """Answer question based on context using LLM API with conversation history"""
+        context = await self._qa_context(question, context, document_id)
+
         try:
             # Use Groq (Llama model) if available
             if self.groq_client:
@@ -570,14 +941,25 @@ PENTING: Berikan HANYA dalam format JSON array string, tanpa penjelasan tambahan
             else:
                 # Simple fallback if no Groq API key
                 logger.info("No Groq client available, using simple Q&A")
-                return await self._simple_qa(question, context)
+                return await self._simple_qa(question, context, document_id)
                 
         except Exception as e:
             logger.error(f"QA error: {e}")
-            return await self._simple_qa(question, context)
+            return await self._simple_qa(question, context, document_id)
 
-    async def _qa_with_groq(self, question: str, context: str, conversation_history: List = None) -> Dict[str, Any]:
-        """Answer question using Groq Llama API with conversation history"""
+    async def _qa_context(self, question: str, context: Optional[str], document_id: Optional[int]) -> str:
+        """Narrow the context to the chunks most relevant to the question"""
+        if document_id is not None:
+            # Loading a cold index and scoring it is blocking work; keep it off the event loop
+            chunks = await asyncio.to_thread(
+                retrieval_service.top_chunks, document_id, question, settings.QA_TOP_K_CHUNKS
+            )
+            if chunks:
+                context = "\n\n".join(chunks)
+        return context or ""
+
+    def _build_qa_messages(self, question: str, context: str, conversation_history: List = None) -> List[Dict[str, str]]:
+        """Chat messages for a QA request: system prompt, recent history, then question with context"""
         # Build conversation history for context
         history_context = ""
         if conversation_history:
@@ -621,22 +1003,28 @@ HINDARI: Pengulangan informasi, penjelasan panjang untuk pertanyaan simple."""
                 })
         
         # Add current question with context
-        current_prompt = f"""Konteks: {context[:3000]}
+        current_prompt = f"""Konteks: {context[:settings.QA_MAX_CONTEXT_CHARS]}
 
 Pertanyaan: {question}
 
 Jawab RINGKAS dan LANGSUNG. Jangan ulangi informasi yang sudah disebutkan sebelumnya."""
 
         messages.append({"role": "user", "content": current_prompt})
+        return messages
 
-        response = await self.groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
+    async def _qa_with_groq(self, question: str, context: str, conversation_history: List = None) -> Dict[str, Any]:
+        """Answer question using Groq Llama API with conversation history"""
+        messages = self._build_qa_messages(question, context, conversation_history)
+
+        content = await self._chat_completion(
+            model=QA_MODEL,
             messages=messages,
+            priority=INTERACTIVE,
             max_tokens=150,  # Reduced to make responses more concise
             temperature=0.1  # Lower temperature for more focused responses
         )
 
-        answer = response.choices[0].message.content.strip()
+        answer = content.strip()
         
         return {
             "answer": answer,
@@ -645,8 +1033,114 @@ Jawab RINGKAS dan LANGSUNG. Jangan ulangi informasi yang sudah disebutkan sebelu
             "method": "groq_llama"
         }
 
-    async def _simple_qa(self, question: str, context: str) -> Dict[str, Any]:
+    async def stream_answer(self, question: str, conversation_history: List = None,
+                            document_id: Optional[int] = None,
+                            context: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer a question as a stream of events: {"type": "token", "text": ...}
+        for each piece of the answer, then one {"type": "done", ...} carrying the
+        same fields answer_question returns plus time_to_first_token_ms.
+        """
+        started = time.monotonic()
+        context = await self._qa_context(question, context, document_id)
+
+        if self.groq_client:
+            messages = self._build_qa_messages(question, context, conversation_history or [])
+            params = {"max_tokens": 150, "temperature": 0.1}
+            key = llm_cache.make_key(QA_MODEL, messages, params)
+            pieces: List[str] = []
+            first_token_at = None
+
+            try:
+                cached = await asyncio.to_thread(llm_cache.get, key) if settings.LLM_CACHE_ENABLED else None
+                if cached is not None:
+                    first_token_at = time.monotonic()
+                    pieces.append(cached)
+                    yield {"type": "token", "text": cached}
+                else:
+                    stream = await llm_scheduler.run(
+                        lambda: self.groq_client.chat.completions.create(
+                            model=QA_MODEL, messages=messages, stream=True, **params
+                        ),
+                        estimated_tokens=llm_scheduler.estimate_tokens(messages, params["max_tokens"]),
+                        priority=INTERACTIVE
+                    )
+                    async for chunk in stream:
+                        text = chunk.choices[0].delta.content if chunk.choices else None
+                        if not text:
+                            continue
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
+                        pieces.append(text)
+                        yield {"type": "token", "text": text}
+
+                    if settings.LLM_CACHE_ENABLED and pieces:
+                        await asyncio.to_thread(llm_cache.put, key, "".join(pieces))
+
+                answer = "".join(pieces).strip()
+                if answer:
+                    yield {
+                        "type": "done",
+                        "answer": answer,
+                        "confidence": 0.85,
+                        "context_used": context[:200] + "..." if len(context) > 200 else context,
+                        "method": "groq_llama",
+                        "time_to_first_token_ms": round((first_token_at - started) * 1000, 1)
+                    }
+                    return
+            except Exception as e:
+                logger.error(f"Streaming QA error: {e}")
+                if pieces:
+                    # Part of the answer already reached the client; finish with what we have
+                    yield {
+                        "type": "done",
+                        "answer": "".join(pieces).strip(),
+                        "confidence": 0.5,
+                        "context_used": context[:200] + "..." if len(context) > 200 else context,
+                        "method": "groq_llama_partial",
+                        "time_to_first_token_ms": round((first_token_at - started) * 1000, 1)
+                    }
+                    return
+        else:
+            logger.info("No Groq client available, using simple Q&A")
+
+        # No Groq, or it failed before producing anything: answer in one piece
+        result = await self._simple_qa(question, context, document_id)
+        yield {"type": "token", "text": result["answer"]}
+        yield {
+            "type": "done",
+            **result,
+            "time_to_first_token_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+
+    async def _simple_qa(self, question: str, context: str, document_id: Optional[int] = None) -> Dict[str, Any]:
         """Simple QA fallback using keyword matching"""
+        # Nearest sentence from the document's vector index
+        if document_id is not None:
+            hits = await asyncio.to_thread(retrieval_service.top_sentences, document_id, question, 1)
+            if hits:
+                sentence, score = hits[0]
+                return {
+                    "answer": sentence,
+                    "confidence": round(min(0.3 + 0.5 * score, 0.8), 2),
+                    "context_used": sentence,
+                    "method": "tfidf_retrieval"
+                }
+
+        best_sentence = await cpu_executor.run(_run_nlp_method, "_best_matching_sentence", question, context)
+        
+        if not best_sentence:
+            best_sentence = "Saya tidak dapat menemukan informasi ini dalam teks yang diberikan."
+        
+        return {
+            "answer": best_sentence,
+            "confidence": 0.3,  # Lower confidence for simple method
+            "context_used": best_sentence,
+            "method": "keyword_matching"
+        }
+
+    def _best_matching_sentence(self, question: str, context: str) -> str:
+        """Sentence sharing the most words with the question (CPU-bound, runs in the executor pool)"""
         question_words = set(word_tokenize(question.lower()))
         sentences = sent_tokenize(context)
         
@@ -661,15 +1155,11 @@ Jawab RINGKAS dan LANGSUNG. Jangan ulangi informasi yang sudah disebutkan sebelu
                 max_matches = matches
                 best_sentence = sentence
         
-        if not best_sentence:
-            best_sentence = "Saya tidak dapat menemukan informasi ini dalam teks yang diberikan."
-        
-        return {
-            "answer": best_sentence,
-            "confidence": 0.3,  # Lower confidence for simple method
-            "context_used": best_sentence,
-            "method": "keyword_matching"
-        }
+        return best_sentence
+
+def _run_nlp_method(name: str, *args):
+    """Executor entry point; module-level so process pools can pickle it"""
+    return getattr(nlp_service, name)(*args)
 
 # Global instance
 nlp_service = NLPService()
\ No newline at end of file
@@ -1,39 +1,175 @@
 import fitz  # PyMuPDF
 import pdfplumber
-import re
+import io
 import logging
-from typing import Optional, Tuple
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import tempfile
 import os
 
+from app.core.config import settings
+from app.services.text_cleaner import text_cleaner
+
 logger = logging.getLogger(__name__)
 
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Extract text of pages [start, end) - runs in a worker process with its own fitz handle."""
+    doc = fitz.open(file_path)
+    try:
+        return [doc[page_num].get_text() for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+def _extract_page_list_pdfplumber(file_path: str, page_indices: List[int]) -> List[str]:
+    """Extract text of selected pages with pdfplumber - runs in a worker process."""
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[page_num].extract_text() or "" for page_num in page_indices]
+
+class PDFSession:
+    """A PDF parsed once, serving validation, metadata, page count and text from one handle."""
+    
+    def __init__(self, source: Union[Path, str, bytes], filename: Optional[str] = None):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            # In-memory upload - no disk round-trip needed
+            self.file_path = None
+            self.data = bytes(source)
+            self.size = len(self.data)
+            self.doc = fitz.open(stream=self.data, filetype="pdf")
+        else:
+            self.file_path = Path(source)
+            self.data = None
+            self.size = self.file_path.stat().st_size
+            self.doc = fitz.open(self.file_path)
+        
+        self.filename = filename or (self.file_path.name if self.file_path else "document.pdf")
+        self._metadata = None
+        self._plumber = None
+        
+        # Engine that produced each page's text, filled in as pages are extracted
+        self.page_engines: Dict[int, str] = {}
+    
+    @property
+    def page_count(self) -> int:
+        return self.doc.page_count
+    
+    @property
+    def metadata(self) -> dict:
+        """PDF metadata in the shape returned by PDFProcessor.extract_metadata."""
+        if self._metadata is None:
+            metadata = self.doc.metadata or {}
+            self._metadata = {
+                'title': metadata.get('title', ''),
+                'author': metadata.get('author', ''),
+                'subject': metadata.get('subject', ''),
+                'creator': metadata.get('creator', ''),
+                'producer': metadata.get('producer', ''),
+                'creation_date': metadata.get('creationDate', ''),
+                'modification_date': metadata.get('modDate', ''),
+                'page_count': self.page_count
+            }
+        return self._metadata
+    
+    def page_text(self, page_num: int) -> str:
+        """Raw PyMuPDF text of a 0-based page index."""
+        return self.doc[page_num].get_text()
+    
+    def iter_raw_pages(self, start: int = 0) -> Iterator[Tuple[int, str]]:
+        """Yield (page_no, raw_text) for every page from page index start."""
+        for page_num in range(start, self.page_count):
+            yield page_num + 1, self.page_text(page_num)
+    
+    @property
+    def plumber(self):
+        """pdfplumber handle over the same source, opened only when a fallback needs it."""
+        if self._plumber is None:
+            source = self.file_path if self.file_path else io.BytesIO(self.data)
+            self._plumber = pdfplumber.open(source)
+        return self._plumber
+    
+    def close(self):
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        self.doc.close()
+    
+    def __enter__(self) -> "PDFSession":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 class PDFProcessor:
     """Handle PDF text extraction with multiple methods for reliability."""
     
     def __init__(self):
         self.max_file_size = 50 * 1024 * 1024  # 50MB
         self.supported_extensions = ['.pdf']
+        
+        # Parallel extraction settings
+        self.extraction_workers = max(1, settings.PDF_EXTRACTION_WORKERS)
+        self.shard_size = max(1, settings.PDF_EXTRACTION_SHARD_SIZE)
+        self.parallel_min_pages = settings.PDF_PARALLEL_MIN_PAGES
+        self.min_page_chars = settings.PDF_MIN_PAGE_CHARS
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the extraction process pool on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.extraction_workers)
+            return self._executor
+    
+    def shutdown(self):
+        """Stop the extraction process pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+    
+    def _page_shards(self, page_count: int, first_page: int = 0) -> List[Tuple[int, int]]:
+        """Split the page range from page index first_page into (start, end) shards of shard_size pages."""
+        return [
+            (start, min(start + self.shard_size, page_count))
+            for start in range(first_page, page_count, self.shard_size)
+        ]
+    
+    def use_parallel_extraction(self, page_count: int) -> bool:
+        """Whether a document is large enough to be worth the process pool."""
+        return self.extraction_workers > 1 and page_count >= self.parallel_min_pages
+    
+    def open_session(self, source: Union[Path, str, bytes], filename: Optional[str] = None) -> PDFSession:
+        """Open and parse a PDF once from a path or an in-memory buffer."""
+        return PDFSession(source, filename=filename)
+    
+    def validate_session(self, session: PDFSession) -> Tuple[bool, str]:
+        """Validate an opened PDF without parsing it again."""
+        # Check file size
+        if session.size > self.max_file_size:
+            return False, "File size exceeds 50MB limit"
+        
+        # Check extension
+        if Path(session.filename).suffix.lower() not in self.supported_extensions:
+            return False, "Only PDF files are supported"
+        
+        if session.page_count == 0:
+            return False, "PDF has no pages"
+        
+        return True, "Valid PDF file"
     
     def validate_pdf(self, file_path: Path) -> Tuple[bool, str]:
         """Validate PDF file before processing."""
         try:
-            # Check file size
-            if file_path.stat().st_size > self.max_file_size:
-                return False, "File size exceeds 50MB limit"
-            
-            # Check extension
+            # Check extension before paying for a parse
             if file_path.suffix.lower() not in self.supported_extensions:
                 return False, "Only PDF files are supported"
             
-            # Try to open with PyMuPDF
-            doc = fitz.open(file_path)
-            if doc.page_count == 0:
-                return False, "PDF has no pages"
-            doc.close()
-            
-            return True, "Valid PDF file"
+            with self.open_session(file_path) as session:
+                return self.validate_session(session)
         
         except Exception as e:
             logger.error(f"PDF validation error: {str(e)}")
@@ -42,185 +178,198 @@ class PDFProcessor:
     def extract_text_pymupdf(self, file_path: Path) -> Optional[str]:
         """Extract text using PyMuPDF - good for most PDFs."""
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                page_text = page.get_text()
-                text += page_text + "\n\n"
-            
-            doc.close()
-            return text.strip()
+            with self.open_session(file_path) as session:
+                pages = [page_text for _, page_text in session.iter_raw_pages()]
+            return "\n\n".join(pages).strip()
         
         except Exception as e:
             logger.error(f"PyMuPDF extraction error: {str(e)}")
             return None
     
-    def extract_text_pdfplumber(self, file_path: Path) -> Optional[str]:
-        """Extract text using pdfplumber - good for tables and structured content."""
+    def extract_text_pymupdf_parallel(self, file_path: Path, page_count: int) -> Optional[str]:
+        """Extract text using PyMuPDF with page shards spread over a process pool."""
         try:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
-            
-            return text.strip()
+            with self.open_session(file_path) as session:
+                pages = [page_text for _, page_text in self._iter_raw_pages_parallel(session)]
+            return "\n\n".join(pages).strip()
         
         except Exception as e:
-            logger.error(f"pdfplumber extraction error: {str(e)}")
+            logger.error(f"Parallel PyMuPDF extraction error: {str(e)}")
             return None
     
-    def clean_text(self, text: str) -> str:
-        """Clean extracted text from common PDF artifacts."""
-        if not text:
-            return ""
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r' {2,}', ' ', text)
-        text = re.sub(r'\t+', ' ', text)
-        
-        # Remove common academic paper headers/footers and metadata
-        # These patterns appear frequently in journal PDFs
-        metadata_patterns = [
-            r'(?i)^corresponding author[^\n]*$',
-            r'(?i)^author name[^\n]*$',
-            r'(?i)^copyright.*?\d{4}[^\n]*$',
-            r'(?i)^©.*?\d{4}[^\n]*$',
-            r'(?i)^all rights reserved[^\n]*$',
-            r'(?i)^published by[^\n]*$',
-            r'(?i)^issn[:\s]*[\d-]+[^\n]*$',
-            r'(?i)^doi[:\s]*[^\n]*$',
-            r'(?i)^e-?mail[:\s]*[^\n]*$',
-            r'(?i)^received[:\s]*[^\n]*$',
-            r'(?i)^accepted[:\s]*[^\n]*$',
-            r'(?i)^revised[:\s]*[^\n]*$',
-            r'(?i)^available online[^\n]*$',
-            r'(?i)^this is an open access[^\n]*$',
-        ]
+    def _iter_raw_pages_parallel(self, session: PDFSession, first_page: int = 0) -> Iterator[Tuple[int, str]]:
+        """Yield (page_no, raw_text) in page order from shards running in the process pool."""
+        executor = self._get_executor()
+        shards = deque(self._page_shards(session.page_count, first_page))
+        in_flight = deque()
         
-        for pattern in metadata_patterns:
-            text = re.sub(pattern, '', text, flags=re.MULTILINE)
+        try:
+            while shards or in_flight:
+                # Keep a bounded number of shards in flight so memory stays flat
+                while shards and len(in_flight) < self.extraction_workers * 2:
+                    start, end = shards.popleft()
+                    future = executor.submit(_extract_page_range, str(session.file_path), start, end)
+                    in_flight.append((start, future))
+                
+                start, future = in_flight.popleft()
+                try:
+                    shard_pages = future.result()
+                except BrokenProcessPool as e:
+                    logger.error(f"Extraction pool broken, continuing sequentially: {str(e)}")
+                    self.shutdown()
+                    yield from session.iter_raw_pages(start)
+                    return
+                
+                for offset, page_text in enumerate(shard_pages):
+                    yield start + offset + 1, page_text
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+    
+    def page_needs_fallback(self, page_text: str) -> bool:
+        """Whether PyMuPDF's text for a page looks too thin or garbled to trust."""
+        stripped = page_text.strip()
+        if len(stripped) < self.min_page_chars:
+            return True
         
-        # Remove page numbers and headers/footers (basic patterns)
-        lines = text.split('\n')
-        cleaned_lines = []
+        # Undecodable glyphs come out as replacement or private-use characters
+        garbled = sum(1 for c in stripped if c == '\ufffd' or '\ue000' <= c <= '\uf8ff')
+        return garbled > len(stripped) * 0.3
+    
+    def _extract_pages_pdfplumber(self, session: PDFSession, page_nos: List[int]) -> Dict[int, str]:
+        """Re-extract selected pages with pdfplumber, in parallel when the file is on disk."""
+        page_indices = [page_no - 1 for page_no in page_nos]
         
-        for line in lines:
-            line = line.strip()
-            
-            # Skip likely page numbers
-            if re.match(r'^\d+$', line):
-                continue
-            
-            # Skip very short lines that are likely artifacts
-            if len(line) < 3:
-                continue
-            
-            # Skip lines with mostly special characters
-            if len(re.sub(r'[^a-zA-Z0-9\s]', '', line)) < len(line) * 0.5:
-                continue
-            
-            # Skip lines that look like email addresses or URLs
-            if re.search(r'@|http://|https://|www\.', line) and len(line) < 100:
-                continue
-            
-            # Skip common header/footer indicators
-            skip_patterns = [
-                r'(?i)^page \d+ of \d+',
-                r'(?i)^\d+\s*\|\s*page',
-                r'(?i)^vol\.?\s*\d+',
-                r'(?i)^pp\.?\s*\d+-\d+',
+        if session.file_path and len(page_indices) > 1 and self.extraction_workers > 1:
+            executor = self._get_executor()
+            batch_count = min(self.extraction_workers, len(page_indices))
+            batches = [page_indices[i::batch_count] for i in range(batch_count)]
+            futures = [
+                executor.submit(_extract_page_list_pdfplumber, str(session.file_path), batch)
+                for batch in batches
             ]
             
-            should_skip = False
-            for pattern in skip_patterns:
-                if re.match(pattern, line):
-                    should_skip = True
-                    break
-            
-            if not should_skip:
-                cleaned_lines.append(line)
+            try:
+                texts = {}
+                for batch, future in zip(batches, futures):
+                    for page_num, page_text in zip(batch, future.result()):
+                        texts[page_num + 1] = page_text
+                return texts
+            except BrokenProcessPool as e:
+                logger.error(f"Extraction pool broken, running pdfplumber sequentially: {str(e)}")
+                self.shutdown()
         
-        # Rejoin text
-        cleaned_text = '\n'.join(cleaned_lines)
+        return {
+            page_num + 1: session.plumber.pages[page_num].extract_text() or ""
+            for page_num in page_indices
+        }
+    
+    def _resolve_page_window(self, session: PDFSession, window: List[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+        """Retry the weak pages of a window with pdfplumber and yield the better text per page."""
+        weak_pages = [page_no for page_no, page_text in window if self.page_needs_fallback(page_text)]
+        replacements = {}
+        if weak_pages:
+            try:
+                replacements = self._extract_pages_pdfplumber(session, weak_pages)
+            except Exception as e:
+                logger.error(f"pdfplumber page fallback error: {str(e)}")
+        
+        for page_no, page_text in window:
+            fallback_text = replacements.get(page_no)
+            if fallback_text and len(fallback_text.strip()) > len(page_text.strip()):
+                session.page_engines[page_no] = "pdfplumber"
+                yield page_no, fallback_text
+            else:
+                session.page_engines[page_no] = "pymupdf"
+                yield page_no, page_text
+    
+    def _iter_checked_pages(self, session: PDFSession, raw_pages: Iterator[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+        """Quality-check raw pages in windows of shard_size pages, keeping page order."""
+        window = []
+        for page in raw_pages:
+            window.append(page)
+            if len(window) >= self.shard_size:
+                yield from self._resolve_page_window(session, window)
+                window = []
+        
+        if window:
+            yield from self._resolve_page_window(session, window)
+    
+    def iter_pages(self, source: Union[Path, PDFSession], first_page: int = 0) -> Iterator[Tuple[int, str, str]]:
+        """
+        Yield (page_no, raw, cleaned) one page at a time from page index first_page,
+        cleaning each page as it arrives. Pages PyMuPDF handles badly are retried
+        with pdfplumber; the engine used for each page is recorded in session.page_engines.
+        """
+        if not isinstance(source, PDFSession):
+            with self.open_session(source) as session:
+                yield from self.iter_pages(session, first_page)
+            return
         
-        # Fix common encoding issues
-        cleaned_text = cleaned_text.replace('â€™', "'")
-        cleaned_text = cleaned_text.replace('â€œ', '"')
-        cleaned_text = cleaned_text.replace('â€�', '"')
-        cleaned_text = cleaned_text.replace('â€"', '-')
+        session = source
+        # Worker processes open their own handle, so sharding needs a file on disk
+        if session.file_path and self.use_parallel_extraction(session.page_count - first_page):
+            raw_pages = self._iter_raw_pages_parallel(session, first_page)
+        else:
+            raw_pages = session.iter_raw_pages(first_page)
         
-        return cleaned_text.strip()
+        for page_no, raw_text in self._iter_checked_pages(session, raw_pages):
+            yield page_no, raw_text, self.clean_text(raw_text)
+    
+    def extract_text_pdfplumber(self, file_path: Union[Path, PDFSession]) -> Optional[str]:
+        """Extract text using pdfplumber - good for tables and structured content."""
+        try:
+            if isinstance(file_path, PDFSession):
+                return self._extract_text_pdfplumber(file_path.plumber)
+            
+            with pdfplumber.open(file_path) as pdf:
+                return self._extract_text_pdfplumber(pdf)
+        
+        except Exception as e:
+            logger.error(f"pdfplumber extraction error: {str(e)}")
+            return None
+    
+    def _extract_text_pdfplumber(self, pdf) -> str:
+        """Join the text of every page of an open pdfplumber document."""
+        pages = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                pages.append(page_text)
+        
+        return "\n\n".join(pages).strip()
+    
+    def clean_text(self, text: str) -> str:
+        """Clean extracted text from common PDF artifacts."""
+        return text_cleaner.clean_pdf_text(text)
     
     def extract_metadata(self, file_path: Path) -> dict:
         """Extract PDF metadata."""
         try:
-            doc = fitz.open(file_path)
-            metadata = doc.metadata
-            page_count = doc.page_count
-            doc.close()
-            
-            return {
-                'title': metadata.get('title', ''),
-                'author': metadata.get('author', ''),
-                'subject': metadata.get('subject', ''),
-                'creator': metadata.get('creator', ''),
-                'producer': metadata.get('producer', ''),
-                'creation_date': metadata.get('creationDate', ''),
-                'modification_date': metadata.get('modDate', ''),
-                'page_count': page_count
-            }
+            with self.open_session(file_path) as session:
+                return dict(session.metadata)
         
         except Exception as e:
             logger.error(f"Metadata extraction error: {str(e)}")
             return {}
     
-    def process_pdf(self, file_path: Path) -> dict:
-        """Main method to process PDF file."""
+    def process_pdf(self, source: Union[Path, bytes], filename: Optional[str] = None) -> dict:
+        """Main method to process a PDF file or in-memory PDF buffer."""
         try:
-            # Validate file
-            is_valid, message = self.validate_pdf(file_path)
-            if not is_valid:
+            # Parse the document once for validation, metadata and text
+            try:
+                session = self.open_session(source, filename=filename)
+            except Exception as e:
+                logger.error(f"PDF validation error: {str(e)}")
                 return {
                     'success': False,
-                    'error': message,
+                    'error': f"Invalid PDF file: {str(e)}",
                     'text': '',
                     'metadata': {}
                 }
             
-            # Extract metadata
-            metadata = self.extract_metadata(file_path)
-            
-            # Try PyMuPDF first
-            text = self.extract_text_pymupdf(file_path)
-            
-            # If PyMuPDF fails, try pdfplumber
-            if not text or len(text.strip()) < 100:
-                logger.info("PyMuPDF extraction insufficient, trying pdfplumber")
-                text = self.extract_text_pdfplumber(file_path)
-            
-            if not text or len(text.strip()) < 50:
-                return {
-                    'success': False,
-                    'error': 'Could not extract sufficient text from PDF',
-                    'text': '',
-                    'metadata': metadata
-                }
-            
-            # Clean extracted text
-            cleaned_text = self.clean_text(text)
-            
-            return {
-                'success': True,
-                'text': cleaned_text,
-                'metadata': metadata,
-                'word_count': len(cleaned_text.split()),
-                'char_count': len(cleaned_text)
-            }
+            with session:
+                return self._process_session(session)
         
         except Exception as e:
             logger.error(f"PDF processing error: {str(e)}")
@@ -230,6 +379,72 @@ class PDFProcessor:
                 'text': '',
                 'metadata': {}
             }
+    
+    def _process_session(self, session: PDFSession) -> dict:
+        """Validate, extract and clean an opened PDF."""
+        # Validate file
+        is_valid, message = self.validate_session(session)
+        if not is_valid:
+            return {
+                'success': False,
+                'error': message,
+                'text': '',
+                'metadata': {}
+            }
+        
+        # Extract metadata
+        metadata = dict(session.metadata)
+        
+        # Stream pages through PyMuPDF (sharded over the process pool for
+        # large documents), retrying weak pages with pdfplumber and cleaning
+        # and counting each page as it arrives
+        cleaned_pages = []
+        pages = []
+        raw_char_count = 0
+        word_count = 0
+        char_count = 0
+        
+        for page_no, raw_text, cleaned_page in self.iter_pages(session):
+            raw_char_count += len(raw_text.strip())
+            pages.append({
+                'page_number': page_no,
+                'text': cleaned_page,
+                'engine': session.page_engines.get(page_no, "pymupdf")
+            })
+            if not cleaned_page:
+                continue
+            if cleaned_pages:
+                char_count += 1  # newline joining the pages
+            cleaned_pages.append(cleaned_page)
+            word_count += len(cleaned_page.split())
+            char_count += len(cleaned_page)
+        
+        cleaned_text = '\n'.join(cleaned_pages)
+        del cleaned_pages
+        
+        page_engines = [session.page_engines.get(page_no, "pymupdf") for page_no in range(1, session.page_count + 1)]
+        fallback_pages = [page_no for page_no, engine in enumerate(page_engines, start=1) if engine == "pdfplumber"]
+        if fallback_pages:
+            logger.info(f"pdfplumber used for {len(fallback_pages)} of {session.page_count} pages")
+        
+        if raw_char_count < 50:
+            return {
+                'success': False,
+                'error': 'Could not extract sufficient text from PDF',
+                'text': '',
+                'metadata': metadata
+            }
+        
+        return {
+            'success': True,
+            'text': cleaned_text,
+            'metadata': metadata,
+            'word_count': word_count,
+            'char_count': char_count,
+            'page_engines': page_engines,
+            'fallback_pages': fallback_pages,
+            'pages': pages
+        }
 
 # Global instance
-pdf_processor = PDFProcessor()
\ No newline at end of file
+pdf_processor = PDFProcessor()
@@ -0,0 +1,422 @@
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r'\w+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# Function words ignored when indexing and querying (Indonesian + English)
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were which with
+what who how why when where does did do can
+ada adalah akan apa atau bagaimana dalam dan dari dengan di ini itu juga ke kenapa mengapa oleh pada
+para sebagai siapa tersebut untuk yang
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords or single characters."""
+    return [
+        token for token in _TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
+
+def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """Split text into ~chunk_size character windows overlapping by ~overlap, cut at whitespace."""
+    text = text.strip()
+    if not text:
+        return []
+
+    chunks = []
+    step = max(1, chunk_size - overlap)
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Prefer to end the chunk on a word boundary
+            boundary = text.rfind(' ', start + step, end)
+            if boundary > start:
+                end = boundary
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+
+        next_start = max(start + 1, end - overlap)
+        # Start the next chunk at a word boundary as well
+        boundary = text.find(' ', next_start, end)
+        start = boundary + 1 if boundary != -1 else next_start
+
+    return [chunk for chunk in chunks if chunk]
+
+def split_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """Sentences of at least min_chars characters, split on terminal punctuation."""
+    sentences = (sentence.strip() for sentence in _SENTENCE_END.split(text))
+    return [sentence for sentence in sentences if len(sentence) >= min_chars]
+
+class BM25Index:
+    """Okapi BM25 over document chunks, stored as posting lists."""
+
+    def __init__(self, chunks: List[str], postings: Dict[str, List[Tuple[int, int]]],
+                 lengths: List[int], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.postings = postings
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, chunks: List[str]) -> "BM25Index":
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for chunk_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                postings.setdefault(term, []).append((chunk_id, freq))
+        return cls(chunks, postings, lengths)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """(chunk_id, score) of the best matching chunks, best first."""
+        if not self.chunks:
+            return []
+
+        scores: Dict[int, float] = {}
+        chunk_count = len(self.chunks)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, freq in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / (self.avg_length or 1))
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.chunks,
+            "postings": self.postings,
+            "lengths": self.lengths,
+            "k1": self.k1,
+            "b": self.b,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        postings = {term: [tuple(p) for p in plist] for term, plist in data["postings"].items()}
+        return cls(data["chunks"], postings, data["lengths"], data.get("k1", 1.5), data.get("b", 0.75))
+
+class UnitStore:
+    """
+    Unit texts concatenated in one UTF-8 file and read back through
+    memory-mapped byte offsets, so a loaded index does not hold every
+    sentence and chunk of the document in memory.
+    """
+
+    TEXT_FILE = "tfidf_units.txt"
+    OFFSETS_FILE = "tfidf_offsets.npy"
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, unit_id: int) -> str:
+        start, end = int(self._offsets[unit_id]), int(self._offsets[unit_id + 1])
+        return bytes(self._data[start:end]).decode("utf-8")
+
+    @classmethod
+    def save(cls, directory: Path, units: Sequence[str]):
+        encoded = [unit.encode("utf-8") for unit in units]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(unit) for unit in encoded], out=offsets[1:])
+        with open(directory / cls.TEXT_FILE, "wb") as f:
+            for unit in encoded:
+                f.write(unit)
+        np.save(directory / cls.OFFSETS_FILE, offsets)
+
+    @classmethod
+    def load(cls, directory: Path) -> "UnitStore":
+        offsets = np.load(directory / cls.OFFSETS_FILE, mmap_mode="r")
+        if offsets[-1] == 0:
+            data = np.empty(0, dtype=np.uint8)  # an empty file cannot be mapped
+        else:
+            data = np.memmap(directory / cls.TEXT_FILE, dtype=np.uint8, mode="r")
+        return cls(data, offsets)
+
+class HashedVectorIndex:
+    """
+    Signed feature-hashed TF-IDF vectors for sentences and chunks.
+
+    Rows are L2-normalised and stored as COO arrays (rows, cols, data) so the
+    .npy files can be memory-mapped; scoring every unit against a query is a
+    single sparse matrix-vector product.
+    """
+
+    SENTENCE = 0
+    CHUNK = 1
+
+    _ARRAYS = ("rows", "cols", "data", "kinds", "idf_cols", "idf_values")
+
+    def __init__(self, units: Sequence[str], n_features: int, arrays: Dict[str, np.ndarray]):
+        self.units = units
+        self.n_features = n_features
+        self.rows = arrays["rows"]
+        self.cols = arrays["cols"]
+        self.data = arrays["data"]
+        self.kinds = arrays["kinds"]
+        self.idf_cols = arrays["idf_cols"]
+        self.idf_values = arrays["idf_values"]
+
+    @staticmethod
+    def _hash_tokens(tokens: List[str], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature column and +/-1 sign per token (crc32, stable across processes)."""
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens),
+                             dtype=np.uint32, count=len(tokens))
+        cols = (hashes % n_features).astype(np.int32)
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        return cols, signs
+
+    @classmethod
+    def build(cls, sentences: List[str], chunks: List[str], n_features: int) -> "HashedVectorIndex":
+        units = sentences + chunks
+        kinds = np.array([cls.SENTENCE] * len(sentences) + [cls.CHUNK] * len(chunks), dtype=np.uint8)
+
+        rows, terms, counts = [], [], []
+        for row, unit in enumerate(units):
+            for term, count in Counter(tokenize(unit)).items():
+                rows.append(row)
+                terms.append(term)
+                counts.append(count)
+
+        rows_arr = np.array(rows, dtype=np.int32)
+        cols_arr, signs = cls._hash_tokens(terms, n_features)
+        data = signs * (1.0 + np.log(np.array(counts, dtype=np.float32)))
+
+        # Smoothed idf over all units, kept only for features that occur
+        idf_cols, df = np.unique(cols_arr, return_counts=True)
+        idf_values = (np.log((1.0 + len(units)) / (1.0 + df)) + 1.0).astype(np.float32)
+        data *= idf_values[np.searchsorted(idf_cols, cols_arr)]
+
+        norms = np.sqrt(np.bincount(rows_arr, weights=data.astype(np.float64) ** 2, minlength=len(units)))
+        norms[norms == 0] = 1.0
+        data /= norms[rows_arr].astype(np.float32)
+
+        return cls(units, n_features, {
+            "rows": rows_arr, "cols": cols_arr, "data": data, "kinds": kinds,
+            "idf_cols": idf_cols.astype(np.int32), "idf_values": idf_values,
+        })
+
+    def _query_vector(self, query: str) -> Optional[np.ndarray]:
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        cols, signs = self._hash_tokens(tokens, self.n_features)
+
+        # Features never seen in the document cannot contribute to any score
+        positions = np.searchsorted(self.idf_cols, cols)
+        positions[positions >= len(self.idf_cols)] = 0
+        known = (len(self.idf_cols) > 0) & (self.idf_cols[positions] == cols)
+        if not known.any():
+            return None
+
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        np.add.at(vector, cols[known], signs[known] * self.idf_values[positions[known]])
+        return vector / np.linalg.norm(vector)
+
+    def search(self, query: str, top_k: int, kind: int) -> List[Tuple[int, float]]:
+        """(unit_id, cosine score) of the best units of one kind, best first."""
+        vector = self._query_vector(query)
+        if vector is None or len(self.units) == 0:
+            return []
+
+        scores = np.bincount(self.rows, weights=self.data * vector[self.cols], minlength=len(self.units))
+        scores[self.kinds != kind] = -np.inf
+
+        top_k = min(top_k, int((self.kinds == kind).sum()))
+        if top_k <= 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(unit_id), float(scores[unit_id])) for unit_id in best if scores[unit_id] > 0]
+
+    def save(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in self._ARRAYS:
+            np.save(directory / f"tfidf_{name}.npy", getattr(self, name))
+        UnitStore.save(directory, self.units)
+        tmp_path = directory / "tfidf_units.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"n_features": self.n_features, "unit_count": len(self.units)}, f)
+        # Written last: its presence marks a complete index
+        os.replace(tmp_path, directory / "tfidf_units.json")
+
+    @classmethod
+    def load(cls, directory: Path) -> "HashedVectorIndex":
+        with open(directory / "tfidf_units.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(directory / f"tfidf_{name}.npy", mmap_mode="r")
+            for name in cls._ARRAYS
+        }
+        # Indexes written before UnitStore keep their texts in the JSON file
+        units = meta["units"] if "units" in meta else UnitStore.load(directory)
+        return cls(units, meta["n_features"], arrays)
+
+class RetrievalService:
+    """Builds, persists and queries per-document chunk indexes for question answering."""
+
+    def __init__(self):
+        self.index_dir = Path(settings.INDEX_DIR)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = settings.CHUNK_SIZE
+        self.chunk_overlap = settings.CHUNK_OVERLAP
+        self.retriever = settings.QA_RETRIEVER
+        self.hash_features = settings.QA_HASH_FEATURES
+
+        # Recently used indexes kept in memory, keyed by (kind, document_id)
+        self._loaded: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+        self._max_loaded = 32
+        self._lock = threading.Lock()
+
+    def _document_dir(self, document_id: int) -> Path:
+        return self.index_dir / str(document_id)
+
+    def _bm25_path(self, document_id: int) -> Path:
+        return self._document_dir(document_id) / "bm25.json"
+
+    def _remember(self, key: Tuple[str, int], index: Any):
+        with self._lock:
+            self._loaded[key] = index
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self._max_loaded:
+                self._loaded.popitem(last=False)
+
+    def _cached(self, key: Tuple[str, int]) -> Any:
+        with self._lock:
+            index = self._loaded.get(key)
+            if index is not None:
+                self._loaded.move_to_end(key)
+            return index
+
+    def has_index(self, document_id: int) -> bool:
+        return (
+            self._bm25_path(document_id).exists()
+            and (self._document_dir(document_id) / "tfidf_units.json").exists()
+        )
+
+    def build_index(self, document_id: int, text: str) -> int:
+        """Chunk a document's text and persist its BM25 and vector indexes; returns the chunk count."""
+        chunks = chunk_text(text or "", self.chunk_size, self.chunk_overlap)
+        index = BM25Index.build(chunks)
+
+        path = self._bm25_path(document_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._remember(("bm25", document_id), index)
+
+        vectors = HashedVectorIndex.build(split_sentences(text or ""), chunks, self.hash_features)
+        vectors.save(self._document_dir(document_id))
+        with self._lock:
+            # Reload lazily so queries run against the memory-mapped files
+            self._loaded.pop(("tfidf", document_id), None)
+
+        logger.info(f"Indexed document {document_id}: {len(chunks)} chunks, "
+                    f"{len(vectors.units) - len(chunks)} sentences")
+        return len(chunks)
+
+    def load_index(self, document_id: int) -> Optional[BM25Index]:
+        index = self._cached(("bm25", document_id))
+        if index is not None:
+            return index
+
+        path = self._bm25_path(document_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = BM25Index.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load index for document {document_id}: {e}")
+            return None
+
+        self._remember(("bm25", document_id), index)
+        return index
+
+    def load_vector_index(self, document_id: int) -> Optional[HashedVectorIndex]:
+        index = self._cached(("tfidf", document_id))
+        if index is not None:
+            return index
+
+        directory = self._document_dir(document_id)
+        if not (directory / "tfidf_units.json").exists():
+            return None
+        try:
+            index = HashedVectorIndex.load(directory)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load vector index for document {document_id}: {e}")
+            return None
+
+        self._remember(("tfidf", document_id), index)
+        return index
+
+    def top_chunks(self, document_id: int, question: str, top_k: int) -> List[str]:
+        """Most relevant chunks for a question in document order; the opening chunks if nothing matches."""
+        if self.retriever == "tfidf":
+            vectors = self.load_vector_index(document_id)
+            if vectors is not None:
+                chunk_ids = np.flatnonzero(np.asarray(vectors.kinds) == HashedVectorIndex.CHUNK)
+                if len(chunk_ids) == 0:
+                    return []
+                hits = vectors.search(question, top_k, HashedVectorIndex.CHUNK)
+                if not hits:
+                    return [vectors.units[unit_id] for unit_id in chunk_ids[:top_k]]
+                return [vectors.units[unit_id] for unit_id in sorted(unit_id for unit_id, _ in hits)]
+
+        index = self.load_index(document_id)
+        if index is None or not index.chunks:
+            return []
+
+        hits = index.search(question, top_k)
+        if not hits:
+            return index.chunks[:top_k]
+
+        # Keep reading order so the prompt flows like the document
+        return [index.chunks[chunk_id] for chunk_id in sorted(chunk_id for chunk_id, _ in hits)]
+
+    def top_sentences(self, document_id: int, question: str, top_k: int) -> List[Tuple[str, float]]:
+        """(sentence, cosine score) of the sentences closest to a question, best first."""
+        vectors = self.load_vector_index(document_id)
+        if vectors is None:
+            return []
+        hits = vectors.search(question, top_k, HashedVectorIndex.SENTENCE)
+        return [(vectors.units[unit_id], score) for unit_id, score in hits]
+
+    def delete_index(self, document_id: int):
+        with self._lock:
+            for kind in ("bm25", "tfidf"):
+                self._loaded.pop((kind, document_id), None)
+        shutil.rmtree(self._document_dir(document_id), ignore_errors=True)
+
+# Global instance
+retrieval_service = RetrievalService()
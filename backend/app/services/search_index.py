@@ -0,0 +1,125 @@
+import html
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# rowid = document_id * stride + page_number, so a document's rows form one rowid range
+ROWID_STRIDE = 1_000_000
+
+_QUERY_TERM = re.compile(r'\w+')
+
+# snippet() delimits matches with control characters, so the page text can be
+# HTML-escaped before they are turned into <mark> tags
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+class SearchIndex:
+    """Cross-document full-text search over extracted pages with SQLite FTS5."""
+
+    TABLE = "document_pages_fts"
+
+    def __init__(self):
+        self.enabled = False
+
+    def ensure_schema(self):
+        """Create the FTS5 table; search stays disabled on other databases or without FTS5."""
+        if engine.dialect.name != "sqlite":
+            logger.info("Full-text search disabled: requires SQLite FTS5")
+            return
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+                    "text, document_id UNINDEXED, owner_id UNINDEXED, page_number UNINDEXED, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                ))
+            self.enabled = True
+        except Exception as e:
+            logger.error(f"Full-text search unavailable: {e}")
+
+    def index_document(self, db: Session, document_id: int, owner_id: int, pages: Iterable[Dict[str, Any]]):
+        """Replace a document's rows; pages are dicts with page_number and text. Committed with db."""
+        if not self.enabled:
+            return
+
+        self.remove_document(db, document_id)
+        rows = [
+            {
+                "rowid": document_id * ROWID_STRIDE + (page.get('page_number') or 0),
+                "text": page['text'],
+                "document_id": document_id,
+                "owner_id": owner_id,
+                "page_number": page.get('page_number'),
+            }
+            for page in pages if page.get('text')
+        ]
+        if rows:
+            db.execute(
+                text(f"INSERT INTO {self.TABLE} (rowid, text, document_id, owner_id, page_number) "
+                     "VALUES (:rowid, :text, :document_id, :owner_id, :page_number)"),
+                rows
+            )
+
+    def remove_document(self, db: Session, document_id: int):
+        if not self.enabled:
+            return
+
+        db.execute(
+            text(f"DELETE FROM {self.TABLE} WHERE rowid >= :low AND rowid < :high"),
+            {"low": document_id * ROWID_STRIDE, "high": (document_id + 1) * ROWID_STRIDE}
+        )
+
+    @staticmethod
+    def build_match_query(query: str) -> Optional[str]:
+        """Turn user input into a safe FTS5 query: every word quoted, all required, last one as prefix."""
+        terms = _QUERY_TERM.findall(query)
+        if not terms:
+            return None
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    @staticmethod
+    def highlight(snippet: str) -> str:
+        """HTML-escape a snippet's document text and mark its matches with <mark> tags."""
+        return html.escape(snippet).replace(_MATCH_START, "<mark>").replace(_MATCH_END, "</mark>")
+
+    def search(self, db: Session, owner_id: int, query: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matching pages of one owner's documents, ranked by bm25, with highlighted snippets."""
+        match = self.build_match_query(query)
+        if not match:
+            return []
+
+        rows = db.execute(
+            text(
+                f"SELECT document_id, page_number, "
+                f"snippet({self.TABLE}, 0, :start, :end, '…', 16) AS snippet, "
+                f"bm25({self.TABLE}) AS rank "
+                f"FROM {self.TABLE} WHERE {self.TABLE} MATCH :match AND owner_id = :owner_id "
+                f"ORDER BY rank LIMIT :limit OFFSET :skip"
+            ),
+            {"match": match, "owner_id": owner_id, "limit": limit, "skip": skip,
+             "start": _MATCH_START, "end": _MATCH_END}
+        ).fetchall()
+
+        return [
+            {
+                "document_id": row.document_id,
+                "page_number": row.page_number,
+                "snippet": self.highlight(row.snippet),
+                # bm25() is lower-is-better; flip it so higher means more relevant
+                "score": -row.rank,
+            }
+            for row in rows
+        ]
+
+# Global instance
+search_index = SearchIndex()
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one in-flight task."""
+
+    def __init__(self):
+        self.executed = 0
+        self.deduplicated = 0
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of fn(), shared with every caller that asks for the same key while it runs."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executed += 1
+        else:
+            self.deduplicated += 1
+
+        # Shielded so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.executed + self.deduplicated
+        return {
+            "executed": self.executed,
+            "deduplicated": self.deduplicated,
+            "dedup_rate": self.deduplicated / calls if calls else 0.0,
+            "in_flight": len(self._calls),
+        }
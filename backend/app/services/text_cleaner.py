@@ -0,0 +1,280 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List
+
+# Metadata lines dropped from extracted PDF text. The order matters: the
+# original implementation applied these one after another, and the patterns
+# that allow `[:\s]*` after the keyword can swallow the following line(s).
+_PDF_METADATA_PATTERNS = [
+    r'corresponding author',
+    r'author name',
+    r'copyright.*?\d{4}',
+    r'©.*?\d{4}',
+    r'all rights reserved',
+    r'published by',
+    r'issn',
+    r'doi',
+    r'e-?mail',
+    r'received',
+    r'accepted',
+    r'revised',
+    r'available online',
+    r'this is an open access',
+]
+_PDF_ISSN = 6
+_PDF_SWALLOWING = {6, 7, 8, 9, 10, 11}  # patterns written as `^keyword[:\s]*...`
+
+# Text fragments removed before keyword extraction, applied in this order
+_KEYWORD_PATTERNS = [
+    # Author and copyright related
+    r'(?i)corresponding author[^\n]*',
+    r'(?i)author name[^\n]*',
+    r'(?i)all authors[^\n]*',
+    r'(?i)copyright.*?(\d{4}|all rights)[^\n]*',
+    r'(?i)©.*?(\d{4}|all rights)[^\n]*',
+    r'(?i)all rights reserved[^\n]*',
+
+    # Publishing info
+    r'(?i)published by[^\n]*',
+    r'(?i)issn[:\s]*[\d-]+[^\n]*',
+    r'(?i)doi[:\s]*[\d\.\/\-]+[^\n]*',
+    r'(?i)vol\.?\s*\d+[^\n]*',
+    r'(?i)pp\.?\s*\d+-\d+[^\n]*',
+    r'(?i)page \d+ of \d+[^\n]*',
+
+    # Contact info
+    r'(?i)e-?mail[:\s]*[^\s]+@[^\s]+[^\n]*',
+    r'(?i)received.*?\d{4}[^\n]*',
+    r'(?i)accepted.*?\d{4}[^\n]*',
+    r'(?i)revised.*?\d{4}[^\n]*',
+
+    # Journal names and categories
+    r'(?i)\bINFORMATICS AND SOFTWARE\b',
+    r'(?i)\bSOFTWARE ENGINEERING\b',
+    r'(?i)\bAND SOFTWARE\b',
+
+    # Headers/footers
+    r'(?i)available online[^\n]*',
+    r'(?i)this is an open access[^\n]*',
+]
+
+# Keyword patterns that can run past the end of a line, with the tail that
+# lets them do so (keyword followed only by separators up to the line end)
+_KEYWORD_CROSSING_TAILS = {
+    7: r'(?i)issn[:\s]*\Z',
+    8: r'(?i)doi[:\s]*\Z',
+    9: r'(?i)vol\.?\s*\Z',
+    10: r'(?i)pp\.?\s*\Z',
+    12: r'(?i)e-?mail[:\s]*\Z',
+}
+
+# Superset of every position where a keyword pattern can start. It is run
+# case-sensitively over case-folded text, which is much faster than (?i);
+# _CASE_FOLD maps the characters that (?i) treats as ASCII letters but
+# str.lower() does not, so every (?i) match is still found.
+_CASE_FOLD = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+_KEYWORD_TRIGGER = (
+    r'corresponding author|author name|all authors|copyright|©|all rights reserved'
+    r'|published by|issn[:\s]*(?:[\d-]|$)|doi[:\s]*(?:[\d./-]|$)|vol\.?\s*(?:\d|$)'
+    r'|pp\.?\s*(?:\d|$)|page \d|e-?mail|received|accepted|revised'
+    r'|informatics and software|software engineering|and software'
+    r'|available online|this is an open access'
+)
+
+class TextCleaner:
+    """
+    Precompiled cleaning engine shared by PDF extraction and keyword extraction.
+    Lines are classified in one pass; the rewrite rules only run on the few
+    lines that need them. Output is identical to applying the patterns above
+    one after another over the whole text.
+    """
+
+    def __init__(self):
+        # PDF text cleaning
+        self._multi_space = re.compile(r' {2,}')
+        self._tabs = re.compile(r'\t+')
+        self._metadata_line = re.compile(
+            '(?i)' + '|'.join(f'({pattern})' for pattern in _PDF_METADATA_PATTERNS)
+        )
+        self._not_separator = re.compile(r'[^:\s]')
+        self._issn_value = re.compile(r'[\d-]')
+        self._page_number = re.compile(r'^\d+$')
+        self._special_chars = re.compile(r'[^a-zA-Z0-9\s]')
+        self._contact = re.compile(r'@|http://|https://|www\.')
+        self._header_footer = re.compile(r'(?i)page \d+ of \d+|\d+\s*\|\s*page|vol\.?\s*\d+|pp\.?\s*\d+-\d+')
+        self._encoding_fixes = [
+            ('â€™', "'"),
+            ('â€œ', '"'),
+            ('â€�', '"'),
+            ('â€"', '-'),
+        ]
+
+        # Keyword text cleaning
+        self._keyword_patterns = [re.compile(pattern) for pattern in _KEYWORD_PATTERNS]
+        self._keyword_trigger = re.compile(_KEYWORD_TRIGGER, re.MULTILINE)
+        self._keyword_crossing = {
+            index: re.compile(pattern) for index, pattern in _KEYWORD_CROSSING_TAILS.items()
+        }
+
+    def clean_pdf_text(self, text: str) -> str:
+        """Clean extracted text from common PDF artifacts (PDFProcessor.clean_text)."""
+        if not text:
+            return ""
+
+        # Remove excessive whitespace (blank lines are dropped by the line filter)
+        text = self._multi_space.sub(' ', text)
+        text = self._tabs.sub(' ', text)
+
+        lines = text.split('\n')
+        removed = self._find_metadata_lines(lines)
+
+        cleaned_lines = []
+        for index, line in enumerate(lines):
+            if index in removed:
+                continue
+            line = line.strip()
+            if self._keep_pdf_line(line):
+                for broken, fixed in self._encoding_fixes:
+                    if broken in line:
+                        line = line.replace(broken, fixed)
+                cleaned_lines.append(line)
+
+        return '\n'.join(cleaned_lines).strip()
+
+    def _find_metadata_lines(self, lines: List[str]) -> set:
+        """Indexes of lines removed by the metadata patterns, swallowed lines included."""
+        # Classify every line once: which metadata pattern (if any) it starts with
+        candidates = [[] for _ in _PDF_METADATA_PATTERNS]
+        for index, line in enumerate(lines):
+            match = self._metadata_line.match(line)
+            if match:
+                candidates[match.lastindex - 1].append((index, match.end(match.lastindex)))
+
+        removed = set()
+        # Replay the patterns in their original order so swallowing behaves the same
+        for pattern_index, pattern_lines in enumerate(candidates):
+            resume = 0
+            for index, keyword_end in pattern_lines:
+                if index < resume or index in removed:
+                    continue
+
+                if pattern_index not in _PDF_SWALLOWING:
+                    removed.add(index)
+                    continue
+
+                line = lines[index]
+                value = self._not_separator.search(line, keyword_end)
+                if value:
+                    if pattern_index == _PDF_ISSN and not self._issn_value.match(line, value.start()):
+                        continue
+                    removed.add(index)
+                    continue
+
+                # Nothing but separators after the keyword: the match runs on
+                # to the next line that has any other character
+                target = index + 1
+                while target < len(lines):
+                    if target not in removed:
+                        value = self._not_separator.search(lines[target])
+                        if value:
+                            break
+                    target += 1
+
+                if target == len(lines):
+                    if pattern_index == _PDF_ISSN:
+                        continue
+                    target = len(lines) - 1
+                elif pattern_index == _PDF_ISSN and not self._issn_value.match(lines[target], value.start()):
+                    continue
+
+                removed.update(range(index, target + 1))
+                resume = target + 1
+
+        return removed
+
+    def _keep_pdf_line(self, line: str) -> bool:
+        """Line filter for page numbers, short artifacts, contact lines and headers."""
+        # Skip very short lines that are likely artifacts
+        if len(line) < 3:
+            return False
+
+        # Skip likely page numbers
+        if self._page_number.match(line):
+            return False
+
+        # Skip lines with mostly special characters
+        if len(self._special_chars.sub('', line)) < len(line) * 0.5:
+            return False
+
+        # Skip lines that look like email addresses or URLs
+        if len(line) < 100 and self._contact.search(line):
+            return False
+
+        # Skip common header/footer indicators
+        return not self._header_footer.match(line)
+
+    def clean_for_keywords(self, text: str) -> str:
+        """Clean text specifically for keyword extraction (NLPService._clean_text_for_keywords)."""
+        lines = text.split('\n')
+        triggered = self._keyword_trigger_lines(text, lines)
+        filtered_lines = []
+
+        index = 0
+        while index < len(lines):
+            if index not in triggered:
+                line = lines[index]
+                if self._keep_keyword_line(line):
+                    filtered_lines.append(line)
+                index += 1
+                continue
+
+            end, segment = self._rewrite_keyword_segment(lines, index)
+            for rewritten in segment.split('\n'):
+                if self._keep_keyword_line(rewritten):
+                    filtered_lines.append(rewritten)
+            index = end + 1
+
+        return '\n'.join(filtered_lines)
+
+    def _keyword_trigger_lines(self, text: str, lines: List[str]) -> set:
+        """Indexes of lines where a keyword pattern may start, from one scan of the text."""
+        # Case folding keeps every character in place, so offsets map straight back to lines
+        folded = text.translate(_CASE_FOLD).lower()
+        line_starts = list(accumulate((len(line) + 1 for line in lines), initial=0))
+        return {
+            bisect_right(line_starts, match.start()) - 1
+            for match in self._keyword_trigger.finditer(folded)
+        }
+
+    def _rewrite_keyword_segment(self, lines: List[str], start: int):
+        """
+        Apply the keyword patterns to the smallest run of lines starting at start
+        that no match can cross. Returns (last line index, rewritten text).
+        """
+        end = start
+        while True:
+            segment = '\n'.join(lines[start:end + 1])
+            extended = False
+            for pattern_index, pattern in enumerate(self._keyword_patterns):
+                crossing = self._keyword_crossing.get(pattern_index)
+                if crossing and end + 1 < len(lines) and crossing.search(segment):
+                    # This pattern could continue onto the next line - widen and redo
+                    end += 1
+                    extended = True
+                    break
+                segment = pattern.sub(' ', segment)
+
+            if not extended:
+                return end, segment
+
+    def _keep_keyword_line(self, line: str) -> bool:
+        """Drop blank lines and lines that are mostly uppercase (likely headers)."""
+        line_stripped = line.strip()
+        if not line_stripped:
+            return False
+        upper_count = sum(map(str.isupper, line_stripped))
+        return upper_count < len(line_stripped) * 0.7
+
+# Global instance
+text_cleaner = TextCleaner()
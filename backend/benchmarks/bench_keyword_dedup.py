@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pairwise substring deduplication (the old YAKE-only path of
+extract_keywords) vs the token trie in keyword_dedup, as the keyword count
+grows towards corpus scale.
+
+Usage (from the backend folder):
+    python benchmarks/bench_keyword_dedup.py
+
+The two are not meant to agree exactly: the trie compares stemmed tokens,
+so "data" no longer swallows "database" while "neural networks" now
+merges with "neural network". Both kept counts are printed.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.services.keyword_dedup import deduplicate_keywords
+
+SEED = 42
+SIZES = [100, 1_000, 5_000, 20_000]
+
+def legacy_deduplicate(keywords):
+    """extract_keywords' YAKE-only deduplication before the trie, without the top_k cut."""
+    final_keywords = []
+    seen_keywords = set()
+    for kw in keywords:
+        kw_normalized = kw['keyword'].lower().strip()
+        is_duplicate = False
+        for seen in seen_keywords:
+            if kw_normalized in seen or seen in kw_normalized:
+                is_duplicate = True
+                break
+        if not is_duplicate:
+            final_keywords.append(kw)
+            seen_keywords.add(kw_normalized)
+    return final_keywords
+
+def random_keywords(count: int):
+    """1-3 word phrases over a vocabulary with inflected variants."""
+    rng = random.Random(SEED)
+    stems = [f"topic{i}" for i in range(count // 2)]
+    endings = ["", "", "", "s", "ing", "ed"]
+
+    def word():
+        return rng.choice(stems) + rng.choice(endings)
+
+    return [
+        {"keyword": " ".join(word() for _ in range(rng.randint(1, 3))), "score": i}
+        for i in range(count)
+    ]
+
+def main():
+    print(f"{'keywords':>9} {'pairwise':>10} {'trie':>9} {'kept (pairwise/trie)':>22}")
+    for size in SIZES:
+        keywords = random_keywords(size)
+
+        start = time.perf_counter()
+        legacy = legacy_deduplicate(keywords)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        trie = deduplicate_keywords(keywords, language="en")
+        trie_time = time.perf_counter() - start
+
+        print(f"{size:>9,} {legacy_time * 1000:>8.1f}ms {trie_time * 1000:>7.1f}ms "
+              f"{len(legacy):>12,} / {len(trie):,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
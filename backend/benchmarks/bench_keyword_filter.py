@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Property check + micro-benchmark: compiled keyword filter vs the original
+_is_valid_keyword (substring loops over the stopword lists and nine regexes).
+
+Usage (from the backend folder):
+    python benchmarks/bench_keyword_filter.py               # random candidates
+    python benchmarks/bench_keyword_filter.py papers/*.txt  # plus 1-2 word n-grams from text files
+
+Every candidate must get the same accept/reject decision from both versions.
+"""
+
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.services.nlp_service import nlp_service
+
+SEED = 1234
+RANDOM_CANDIDATES = 200_000
+REPEATS = 3
+
+def legacy_is_valid_keyword(keyword: str, academic_stopwords) -> bool:
+    """NLPService._is_valid_keyword before the combined matcher."""
+    keyword_lower = keyword.lower().strip()
+
+    if len(keyword_lower) < 4 or len(keyword_lower) > 50:
+        return False
+
+    if keyword_lower in academic_stopwords:
+        return False
+
+    for stopword in academic_stopwords:
+        if stopword in keyword_lower:
+            return False
+
+    specific_rejects = [
+        'corresponding', 'author', 'copyright', 'name', 'informatics',
+        'software engineering', 'software', 'engineering', 'kuliner',
+        'solideo', 'all authors', 'the'
+    ]
+
+    for reject in specific_rejects:
+        if reject in keyword_lower:
+            return False
+
+    alpha_chars = sum(c.isalpha() for c in keyword)
+    if alpha_chars < len(keyword) * 0.6:
+        return False
+
+    if keyword.isupper() and len(keyword) > 3:
+        return False
+
+    reject_patterns = [
+        r'^\d+$',
+        r'^[a-z]{1,2}$',
+        r'\b(the|and|or|for|of|to|in|on|at|by|with|from|that|this|which)\b',
+        r'\b(dan|atau|untuk|dari|ke|di|pada|oleh|dengan|yang|ini|itu)\b',
+        r'^(fig|figure|table|tabel)\s*\d*$',
+        r'^section\s*\d*$',
+        r'@|©|®|™|\|',
+        r'\b(page|pp|vol|issue|doi|issn)\b',
+        r'^(author|copyright|corresponding|name)\b',
+    ]
+
+    for pattern in reject_patterns:
+        if re.search(pattern, keyword_lower):
+            return False
+
+    words = keyword_lower.split()
+    has_substantial_word = any(len(word) >= 4 for word in words)
+    if not has_substantial_word:
+        return False
+
+    return True
+
+def random_candidates(count: int):
+    """Candidates mixing stopword fragments, real words, digits, symbols and case changes."""
+    rng = random.Random(SEED)
+    fragments = sorted(nlp_service.academic_stopwords) + [
+        'machine', 'learning', 'pembelajaran', 'mesin', 'neural', 'jaringan', 'data',
+        'analisis', 'sistem', 'model', 'section', 'fig', 'tabel', 'pp', 'vol', 'of',
+        'ke', 'di', 'ITS', 'Öffnung', 'İstanbul', 'ſtraße', 'K', 'ab',
+    ]
+    alphabet = string.ascii_letters + string.digits + " -_.,@|©®™\t\n"
+    candidates = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            words = [rng.choice(fragments) for _ in range(rng.randint(1, 3))]
+            candidate = rng.choice([" ", "", "-", "  "]).join(words)
+        else:
+            candidate = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 20)))
+        style = rng.random()
+        if style < 0.15:
+            candidate = candidate.upper()
+        elif style < 0.3:
+            candidate = candidate.title()
+        if rng.random() < 0.1:
+            candidate = f" {candidate}{rng.choice(['', ' ', '1', '12'])} "
+        candidates.append(candidate)
+    return candidates
+
+def file_candidates(paths):
+    """1- and 2-word n-grams of the given text files, like YAKE candidates."""
+    candidates = []
+    for path in paths:
+        words = Path(path).read_text(encoding="utf-8", errors="ignore").split()
+        candidates.extend(words)
+        candidates.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return candidates
+
+def best_time(fn, candidates) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for candidate in candidates:
+            fn(candidate)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    candidates = random_candidates(RANDOM_CANDIDATES) + file_candidates(sys.argv[1:])
+    stopwords = nlp_service.academic_stopwords
+
+    mismatches = [
+        c for c in candidates
+        if legacy_is_valid_keyword(c, stopwords) != nlp_service._is_valid_keyword(c)
+    ]
+    accepted = sum(nlp_service._is_valid_keyword(c) for c in candidates)
+    print(f"{len(candidates):,} candidates, {accepted:,} accepted, {len(mismatches)} mismatches")
+    for candidate in mismatches[:10]:
+        print(f"  MISMATCH: {candidate!r}")
+    if mismatches:
+        return 1
+
+    legacy = best_time(lambda c: legacy_is_valid_keyword(c, stopwords), candidates)
+    compiled = best_time(nlp_service._is_valid_keyword, candidates)
+    per_call = 1e6 / len(candidates)
+    print(f"legacy:   {legacy * per_call:6.2f} µs/candidate")
+    print(f"compiled: {compiled * per_call:6.2f} µs/candidate  ({legacy / compiled:.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: YAKE over the full cleaned text vs over sampled windows
+(abstract, introduction, headings, strided body) as document length grows.
+
+Usage (from the backend folder):
+    python benchmarks/bench_keyword_windows.py              # synthetic papers, 10-400 pages
+    python benchmarks/bench_keyword_windows.py paper.txt    # extracted text of real papers
+
+For every document the top-10 keyword overlap between both runs is reported.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.services.language import language_detector
+from app.services.nlp_service import nlp_service
+
+PAGE_COUNTS = [10, 25, 50, 100, 200, 400]
+WORDS_PER_PAGE = 450
+TOP_K = 10
+
+def synthetic_paper(pages: int, seed: int = 7) -> str:
+    """Paper-shaped text: abstract, numbered sections, topical body, references."""
+    rng = random.Random(seed)
+    topic = [
+        "machine learning", "neural network", "training data", "feature extraction",
+        "classification accuracy", "convolutional layer", "gradient descent",
+        "learning rate", "validation set", "image recognition",
+    ]
+    vocabulary = [f"term{i}" for i in range(3000)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+
+    def sentence() -> str:
+        words = rng.choices(vocabulary, weights, k=rng.randint(10, 20))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(topic))
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(words: int) -> str:
+        sentences = []
+        while sum(len(s.split()) for s in sentences) < words:
+            sentences.append(sentence())
+        return " ".join(sentences)
+
+    parts = ["Abstract", paragraph(200), "1. Introduction", paragraph(WORDS_PER_PAGE)]
+    body_words = max(pages - 3, 1) * WORDS_PER_PAGE
+    section = 2
+    while body_words > 0:
+        parts.append(f"{section}. Section on {rng.choice(topic).title()}")
+        parts.append(paragraph(min(WORDS_PER_PAGE * 3, body_words)))
+        body_words -= WORDS_PER_PAGE * 3
+        section += 1
+    parts.append("References")
+    parts.extend(f"[{i}] Author A., Author B. Title of paper {i}. Journal, 2020." for i in range(pages * 2))
+    return "\n".join(parts)
+
+def run(text: str, windowed: bool):
+    cleaned = nlp_service._clean_text_for_keywords(text)
+    language = language_detector.detect(cleaned)
+    if windowed:
+        windows = nlp_service._keyword_windows(
+            cleaned, settings.KEYWORD_TOKEN_BUDGET, settings.KEYWORD_WINDOW_TOKENS
+        )
+    else:
+        windows = [cleaned]
+    start = time.perf_counter()
+    keywords = nlp_service._yake_over_windows(windows, 30, language)
+    elapsed = time.perf_counter() - start
+    return elapsed, [k["keyword"].lower() for k in keywords[:TOP_K]]
+
+def main():
+    if sys.argv[1:]:
+        documents = [(Path(p).name, Path(p).read_text(encoding="utf-8", errors="ignore")) for p in sys.argv[1:]]
+    else:
+        documents = [(f"{pages} pages", synthetic_paper(pages)) for pages in PAGE_COUNTS]
+
+    print(f"budget {settings.KEYWORD_TOKEN_BUDGET} words, windows of {settings.KEYWORD_WINDOW_TOKENS}")
+    print(f"{'document':>14} {'words':>8} {'full':>9} {'windowed':>9} {'overlap@10':>11}")
+    for name, text in documents:
+        full_time, full_keywords = run(text, windowed=False)
+        windowed_time, windowed_keywords = run(text, windowed=True)
+        overlap = len(set(full_keywords) & set(windowed_keywords)) / max(len(full_keywords), 1)
+        print(f"{name:>14} {len(text.split()):>8,} {full_time * 1000:>7.0f}ms "
+              f"{windowed_time * 1000:>7.0f}ms {overlap:>10.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
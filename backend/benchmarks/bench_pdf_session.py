@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: separate validate/metadata/extract parses vs a single PDFSession.
+
+Usage (from the backend folder):
+    python benchmarks/bench_pdf_session.py                 # synthetic 300/600 page PDFs
+    python benchmarks/bench_pdf_session.py thesis.pdf ...  # your own files
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import fitz  # PyMuPDF
+
+from app.services.pdf_processor import pdf_processor
+
+REPEATS = 5
+
+def build_synthetic_pdf(path: Path, pages: int):
+    """Write a text-heavy PDF with the given number of pages."""
+    doc = fitz.open()
+    paragraph = (
+        "Penelitian ini membahas metode ekstraksi kata kunci pada dokumen akademik. "
+        "The proposed approach combines statistical features with language models. "
+    ) * 12
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"Page {page_num + 1}\n{paragraph}", fontsize=9)
+    doc.save(path)
+    doc.close()
+
+def legacy_path(file_path: Path):
+    """validate_pdf + extract_metadata + extract_text_pymupdf: three separate parses."""
+    pdf_processor.validate_pdf(file_path)
+    pdf_processor.extract_metadata(file_path)
+    pdf_processor.extract_text_pymupdf(file_path)
+
+def session_path(source):
+    """One PDFSession serving validation, metadata and text."""
+    with pdf_processor.open_session(source, filename="bench.pdf") as session:
+        pdf_processor.validate_session(session)
+        session.metadata
+        "\n\n".join(text for _, text in session.iter_raw_pages())
+
+def parse_only(file_path: Path, opens: int):
+    """Cost of opening (parsing) the document `opens` times."""
+    for _ in range(opens):
+        fitz.open(file_path).close()
+
+def timed(func, *args) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def run(file_path: Path):
+    data = file_path.read_bytes()
+    legacy = timed(legacy_path, file_path)
+    session = timed(session_path, file_path)
+    in_memory = timed(session_path, data)
+    parse_three = timed(parse_only, file_path, 3)
+    parse_one = timed(parse_only, file_path, 1)
+
+    with fitz.open(file_path) as doc:
+        pages = doc.page_count
+
+    print(f"{file_path.name}: {pages} pages, {len(data) / 1024 / 1024:.1f} MB")
+    print(f"  legacy (3 parses)      {legacy * 1000:8.1f} ms")
+    print(f"  PDFSession (path)      {session * 1000:8.1f} ms  ({legacy / session:.2f}x)")
+    print(f"  PDFSession (bytes)     {in_memory * 1000:8.1f} ms  ({legacy / in_memory:.2f}x)")
+    print(f"  parse time saved       {(parse_three - parse_one) * 1000:8.1f} ms")
+
+def main():
+    paths = [Path(arg) for arg in sys.argv[1:]]
+    if paths:
+        for path in paths:
+            run(path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages in (300, 600):
+            path = Path(tmp_dir) / f"synthetic_{pages}.pdf"
+            build_synthetic_pdf(path, pages)
+            run(path)
+
+if __name__ == "__main__":
+    main()
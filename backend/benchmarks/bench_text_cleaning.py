@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: precompiled TextCleaner vs the original multi-pass cleaning.
+
+Usage (from the backend folder):
+    python benchmarks/bench_text_cleaning.py papers/        # folder of .pdf or .txt files
+    python benchmarks/bench_text_cleaning.py a.pdf b.txt
+
+Every document is checked for identical output before timing.
+"""
+
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.services.text_cleaner import text_cleaner
+
+REPEATS = 5
+
+# Reference implementations: PDFProcessor.clean_text and
+# NLPService._clean_text_for_keywords before the shared engine
+
+def legacy_clean_text(text: str) -> str:
+    """Clean extracted text from common PDF artifacts."""
+    if not text:
+        return ""
+
+    # Remove excessive whitespace
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r' {2,}', ' ', text)
+    text = re.sub(r'\t+', ' ', text)
+
+    # Remove common academic paper headers/footers and metadata
+    # These patterns appear frequently in journal PDFs
+    metadata_patterns = [
+        r'(?i)^corresponding author[^\n]*$',
+        r'(?i)^author name[^\n]*$',
+        r'(?i)^copyright.*?\d{4}[^\n]*$',
+        r'(?i)^©.*?\d{4}[^\n]*$',
+        r'(?i)^all rights reserved[^\n]*$',
+        r'(?i)^published by[^\n]*$',
+        r'(?i)^issn[:\s]*[\d-]+[^\n]*$',
+        r'(?i)^doi[:\s]*[^\n]*$',
+        r'(?i)^e-?mail[:\s]*[^\n]*$',
+        r'(?i)^received[:\s]*[^\n]*$',
+        r'(?i)^accepted[:\s]*[^\n]*$',
+        r'(?i)^revised[:\s]*[^\n]*$',
+        r'(?i)^available online[^\n]*$',
+        r'(?i)^this is an open access[^\n]*$',
+    ]
+
+    for pattern in metadata_patterns:
+        text = re.sub(pattern, '', text, flags=re.MULTILINE)
+
+    # Remove page numbers and headers/footers (basic patterns)
+    lines = text.split('\n')
+    cleaned_lines = []
+
+    for line in lines:
+        line = line.strip()
+
+        # Skip likely page numbers
+        if re.match(r'^\d+$', line):
+            continue
+
+        # Skip very short lines that are likely artifacts
+        if len(line) < 3:
+            continue
+
+        # Skip lines with mostly special characters
+        if len(re.sub(r'[^a-zA-Z0-9\s]', '', line)) < len(line) * 0.5:
+            continue
+
+        # Skip lines that look like email addresses or URLs
+        if re.search(r'@|http://|https://|www\.', line) and len(line) < 100:
+            continue
+
+        # Skip common header/footer indicators
+        skip_patterns = [
+            r'(?i)^page \d+ of \d+',
+            r'(?i)^\d+\s*\|\s*page',
+            r'(?i)^vol\.?\s*\d+',
+            r'(?i)^pp\.?\s*\d+-\d+',
+        ]
+
+        should_skip = False
+        for pattern in skip_patterns:
+            if re.match(pattern, line):
+                should_skip = True
+                break
+
+        if not should_skip:
+            cleaned_lines.append(line)
+
+    # Rejoin text
+    cleaned_text = '\n'.join(cleaned_lines)
+
+    # Fix common encoding issues
+    cleaned_text = cleaned_text.replace('â€™', "'")
+    cleaned_text = cleaned_text.replace('â€œ', '"')
+    cleaned_text = cleaned_text.replace('â€�', '"')
+    cleaned_text = cleaned_text.replace('â€"', '-')
+
+    return cleaned_text.strip()
+
+def legacy_clean_text_for_keywords(text: str) -> str:
+    """Clean text specifically for keyword extraction"""
+
+    # Remove common header/footer patterns (more comprehensive)
+    patterns_to_remove = [
+        # Author and copyright related
+        r'(?i)corresponding author[^\n]*',
+        r'(?i)author name[^\n]*',
+        r'(?i)all authors[^\n]*',
+        r'(?i)copyright.*?(\d{4}|all rights)[^\n]*',
+        r'(?i)©.*?(\d{4}|all rights)[^\n]*',
+        r'(?i)all rights reserved[^\n]*',
+
+        # Publishing info
+        r'(?i)published by[^\n]*',
+        r'(?i)issn[:\s]*[\d-]+[^\n]*',
+        r'(?i)doi[:\s]*[\d\.\/\-]+[^\n]*',
+        r'(?i)vol\.?\s*\d+[^\n]*',
+        r'(?i)pp\.?\s*\d+-\d+[^\n]*',
+        r'(?i)page \d+ of \d+[^\n]*',
+
+        # Contact info
+        r'(?i)e-?mail[:\s]*[^\s]+@[^\s]+[^\n]*',
+        r'(?i)received.*?\d{4}[^\n]*',
+        r'(?i)accepted.*?\d{4}[^\n]*',
+        r'(?i)revised.*?\d{4}[^\n]*',
+
+        # Journal names and categories
+        r'(?i)\bINFORMATICS AND SOFTWARE\b',
+        r'(?i)\bSOFTWARE ENGINEERING\b',
+        r'(?i)\bAND SOFTWARE\b',
+
+        # Headers/footers
+        r'(?i)available online[^\n]*',
+        r'(?i)this is an open access[^\n]*',
+    ]
+
+    cleaned = text
+    for pattern in patterns_to_remove:
+        cleaned = re.sub(pattern, ' ', cleaned)
+
+    # Remove lines that are mostly uppercase (likely headers)
+    lines = cleaned.split('\n')
+    filtered_lines = []
+    for line in lines:
+        line_stripped = line.strip()
+        if line_stripped:
+            upper_count = sum(1 for c in line_stripped if c.isupper())
+            if upper_count < len(line_stripped) * 0.7:  # Keep if less than 70% uppercase
+                filtered_lines.append(line)
+
+    cleaned = '\n'.join(filtered_lines)
+
+    return cleaned
+
+
+def load_corpus(paths):
+    """Raw text of every .pdf / .txt file in the given files or folders."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in ('.pdf', '.txt')))
+        else:
+            files.append(path)
+
+    corpus = []
+    for file_path in files:
+        if file_path.suffix.lower() == '.pdf':
+            import fitz  # PyMuPDF
+
+            with fitz.open(file_path) as doc:
+                text = "\n\n".join(page.get_text() for page in doc)
+        else:
+            text = file_path.read_text(encoding='utf-8', errors='replace')
+        corpus.append((file_path.name, text))
+    return corpus
+
+def timed(func, texts) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    corpus = load_corpus([Path(arg) for arg in sys.argv[1:]])
+    texts = [text for _, text in corpus]
+    total_mb = sum(len(text) for text in texts) / 1024 / 1024
+    print(f"Corpus: {len(corpus)} documents, {total_mb:.1f} MB of text")
+
+    # Identical output first - a faster cleaner that changes results is no use
+    for name, text in corpus:
+        if text_cleaner.clean_pdf_text(text) != legacy_clean_text(text):
+            sys.exit(f"clean_text output differs for {name}")
+        if text_cleaner.clean_for_keywords(text) != legacy_clean_text_for_keywords(text):
+            sys.exit(f"_clean_text_for_keywords output differs for {name}")
+    print("Output identical for every document")
+
+    cases = [
+        ("clean_text", legacy_clean_text, text_cleaner.clean_pdf_text),
+        ("_clean_text_for_keywords", legacy_clean_text_for_keywords, text_cleaner.clean_for_keywords),
+    ]
+    for label, legacy, engine in cases:
+        legacy_time = timed(legacy, texts)
+        engine_time = timed(engine, texts)
+        print(f"{label:26} legacy {legacy_time * 1000:9.1f} ms   engine {engine_time * 1000:9.1f} ms   "
+              f"speedup {legacy_time / engine_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
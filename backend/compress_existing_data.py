@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Script untuk mengompresi kolom teks besar yang tersimpan sebelum kompresi diaktifkan
+(documents.extracted_text, document_pages.text, summaries.bullet_points,
+qa_sessions.context_used) dan melaporkan jumlah byte yang dihemat.
+
+Usage:
+    python compress_existing_data.py            # compress rows still stored as plain text
+    python compress_existing_data.py --vacuum   # also run VACUUM so SQLite returns the space
+"""
+
+import sys
+from sqlalchemy import text
+from app.core.database import engine
+from app.models.models import Base
+from app.models.types import compress_text
+
+# (table, column) pairs stored with CompressedText
+COMPRESSED_COLUMNS = [
+    ("documents", "extracted_text"),
+    ("document_pages", "text"),
+    ("summaries", "bullet_points"),
+    ("qa_sessions", "context_used"),
+]
+
+BATCH_SIZE = 200
+
+def compress_column(table: str, column: str):
+    """Compress every plain-text value of one column; returns (rows, bytes_before, bytes_after)."""
+    rows = 0
+    bytes_before = 0
+    bytes_after = 0
+    last_id = 0
+
+    while True:
+        with engine.begin() as conn:
+            batch = conn.execute(
+                text(f"SELECT id, {column} FROM {table} WHERE id > :last_id AND {column} IS NOT NULL "
+                     f"ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": BATCH_SIZE}
+            ).fetchall()
+
+            if not batch:
+                break
+
+            for row_id, value in batch:
+                last_id = row_id
+                if not isinstance(value, str):
+                    continue  # already compressed
+
+                compressed = compress_text(value)
+                conn.execute(
+                    text(f"UPDATE {table} SET {column} = :value WHERE id = :id"),
+                    {"value": compressed, "id": row_id}
+                )
+                rows += 1
+                bytes_before += len(value.encode("utf-8"))
+                bytes_after += len(compressed)
+
+    return rows, bytes_before, bytes_after
+
+def main():
+    print("🗜️ ResearchMate - Compress Existing Text Data")
+    print("=============================================")
+
+    Base.metadata.create_all(bind=engine)
+
+    total_before = 0
+    total_after = 0
+
+    for table, column in COMPRESSED_COLUMNS:
+        try:
+            rows, before, after = compress_column(table, column)
+        except Exception as e:
+            print(f"❌ {table}.{column}: {e}")
+            return 1
+
+        total_before += before
+        total_after += after
+        print(f"✓ {table}.{column}: {rows} rows, {before:,} → {after:,} bytes "
+              f"(saved {before - after:,})")
+
+    print(f"\n📊 Total saved: {total_before - total_after:,} bytes "
+          f"({total_before:,} → {total_after:,})")
+
+    if "--vacuum" in sys.argv:
+        print("\n🧹 Running VACUUM...")
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+        print("✓ Database file compacted")
+
+    print("\n✅ Compression completed!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
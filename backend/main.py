@@ -15,8 +15,17 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TF warnings
 sys.path.append(str(Path(__file__).parent))
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine
+from app.models.models import Base
 from app.api import api_router
+from app.models.migrations import upgrade_schema
+from app.services.pdf_processor import pdf_processor
+from app.services.analysis_cache import analysis_cache
+from app.services.cpu_executor import cpu_executor, loop_lag_monitor
+from app.services.llm_cache import llm_cache
+from app.services.llm_scheduler import llm_scheduler
+from app.services.nlp_service import nlp_service
+from app.services.search_index import search_index
 
 # Configure logging
 logging.basicConfig(
@@ -31,13 +40,18 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting ResearchMate API...")
     
-    # Create database tables
+    # Create missing tables, including ones added to an existing database
     try:
         Base.metadata.create_all(bind=engine)
+        # Columns added since the tables were first created
+        upgrade_schema(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Database initialization error: {e}")
     
+    # Full-text search table (SQLite FTS5)
+    search_index.ensure_schema()
+    
     # Create upload directories
     try:
         Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
@@ -46,10 +60,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Directory creation error: {e}")
     
+    loop_lag_monitor.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down ResearchMate API...")
+    await loop_lag_monitor.stop()
+    pdf_processor.shutdown()
+    cpu_executor.shutdown()
 
 # Create FastAPI application
 app = FastAPI(
@@ -109,6 +128,18 @@ async def health_check():
         "version": settings.VERSION
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Cache and processing metrics."""
+    return {
+        "analysis_cache": analysis_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_single_flight": nlp_service.single_flight.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "nlp_executor": cpu_executor.stats(),
+        "event_loop_lag": loop_lag_monitor.stats()
+    }
+
 @app.get("/")
 async def root():
     """Root endpoint."""
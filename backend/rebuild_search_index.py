@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script untuk membangun ulang indeks pencarian full-text (FTS5) dari dokumen
+yang sudah diproses, misalnya dokumen yang diproses sebelum pencarian tersedia.
+
+Usage:
+    python rebuild_search_index.py
+"""
+
+import sys
+from app.core.database import SessionLocal, engine
+from app.models.migrations import upgrade_schema
+from app.models.models import Base, Document
+from app.services.search_index import search_index
+
+def main():
+    print("🔎 ResearchMate - Rebuild Search Index")
+    print("======================================")
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    search_index.ensure_schema()
+    if not search_index.enabled:
+        print("❌ Full-text search requires SQLite with FTS5")
+        return 1
+
+    db = SessionLocal()
+    indexed = 0
+    try:
+        document_ids = [
+            row.id for row in db.query(Document.id).filter(Document.processing_status == "completed")
+        ]
+        for document_id in document_ids:
+            document = db.query(Document).get(document_id)
+            pages = [
+                {'page_number': page.page_number, 'text': page.text}
+                for page in document.pages
+            ]
+            if not pages and document.extracted_text:
+                pages = [{'page_number': None, 'text': document.extracted_text}]
+
+            search_index.index_document(db, document.id, document.owner_id, pages)
+            db.commit()
+            db.expunge_all()  # don't keep every document's text in memory
+            indexed += 1
+            print(f"✓ {document.original_filename}: {len(pages)} pages")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error rebuilding search index: {e}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"\n✅ Indexed {indexed} documents")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
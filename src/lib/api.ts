@@ -132,8 +132,10 @@ class ApiService {
         return response.json()
     }
 
-    async processDocument(documentId: number): Promise<AnalysisResult> {
-        return this.makeRequest<AnalysisResult>(`/documents/${documentId}/process`, {
+    async processDocument(documentId: number, refresh = false): Promise<AnalysisResult> {
+        // refresh: analyse again even if the same PDF was analysed before
+        const query = refresh ? "?refresh=true" : ""
+        return this.makeRequest<AnalysisResult>(`/documents/${documentId}/process${query}`, {
             method: "POST",
         })
     }